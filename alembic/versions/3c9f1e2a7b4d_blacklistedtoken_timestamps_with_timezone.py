@@ -0,0 +1,40 @@
+"""blacklistedtoken timestamps with timezone
+
+Revision ID: 3c9f1e2a7b4d
+Revises: 18ade1939e6a
+Create Date: 2025-05-20 11:02:14.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f1e2a7b4d'
+down_revision: Union[str, None] = '18ade1939e6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # asyncpg refuses to bind aware datetimes to TIMESTAMP WITHOUT TIME ZONE
+    for column in ('blacklisted_at', 'expires_at'):
+        op.alter_column('blacklistedtoken', column,
+                   existing_type=sa.DateTime(),
+                   type_=sa.DateTime(timezone=True),
+                   existing_nullable=False,
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in ('blacklisted_at', 'expires_at'):
+        op.alter_column('blacklistedtoken', column,
+                   existing_type=sa.DateTime(timezone=True),
+                   type_=sa.DateTime(),
+                   existing_nullable=False,
+                   postgresql_using=f"{column} AT TIME ZONE 'UTC'")
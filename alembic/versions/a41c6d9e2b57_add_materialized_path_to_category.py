@@ -0,0 +1,49 @@
+"""add materialized path to category
+
+Revision ID: a41c6d9e2b57
+Revises: 7d2b5e8c1f36
+Create Date: 2025-05-24 15:12:48.904133
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c6d9e2b57'
+down_revision: Union[str, None] = '7d2b5e8c1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('category', sa.Column('path', sa.String(collation='C'), nullable=True))
+    # categories caught in a parent_id cycle are unreachable from any root, detach them first
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id FROM category WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id FROM category c JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE category SET parent_id = NULL WHERE id NOT IN (SELECT id FROM tree)
+    """)
+    op.execute("""
+        WITH RECURSIVE tree AS (
+            SELECT id, '/' || id || '/' AS path FROM category WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, t.path || c.id || '/' FROM category c JOIN tree t ON c.parent_id = t.id
+        )
+        UPDATE category SET path = tree.path FROM tree WHERE category.id = tree.id
+    """)
+    op.alter_column('category', 'path', nullable=False)
+    op.create_index('ix_category_user_id_path', 'category', ['user_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_category_user_id_path', table_name='category')
+    op.drop_column('category', 'path')
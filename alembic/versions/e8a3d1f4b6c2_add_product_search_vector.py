@@ -0,0 +1,35 @@
+"""add product search vector
+
+Revision ID: e8a3d1f4b6c2
+Revises: c52f8a7d9e13
+Create Date: 2025-05-28 14:36:52.117630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3d1f4b6c2'
+down_revision: Union[str, None] = 'c52f8a7d9e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('product', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(
+        "setweight(to_tsvector('english', name), 'A') || "
+        "setweight(to_tsvector('english', description), 'B')",
+        persisted=True), nullable=True))
+    op.create_index('ix_product_search_vector', 'product', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_search_vector', table_name='product', postgresql_using='gin')
+    op.drop_column('product', 'search_vector')
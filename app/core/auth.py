@@ -1,9 +1,13 @@
 from datetime import datetime, timedelta, timezone
 import jwt
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlalchemy import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 import uuid
+from ..database import engine
 from ..models.blacklistedtoken_model import BlacklistedToken
 from .config import settings
+from .logers import logger
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -28,14 +32,26 @@ def create_refresh_token(data: dict):
     return jwt.encode(data, settings.secret_key, algorithm=settings.algorithm)
 
 
-def clean_old_tokens(session: Session):
-    now = datetime.now(timezone.utc)
-    expired_tokens = session.exec(
-        select(BlacklistedToken).where(BlacklistedToken.expires_at < now)
-    ).all()
-
-    for token in expired_tokens:
-        session.delete(token)
-
-    session.commit()
-    print(f"message: Cleaned {len(expired_tokens)} expired tokens")
+# deletes expired rows a chunk at a time so no single statement holds many
+# locks; SKIP LOCKED lets the job run on several workers at once
+async def purge_expired_tokens(batch_size: int = settings.token_purge_batch_size):
+    purged = 0
+    async with AsyncSession(engine) as session:
+        while True:
+            expired = (
+                select(BlacklistedToken.id)
+                .where(BlacklistedToken.expires_at < datetime.now(timezone.utc))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await session.exec(
+                delete(BlacklistedToken).where(
+                    BlacklistedToken.id.in_(expired.scalar_subquery())
+                )
+            )
+            await session.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                break
+    logger.info(f"Purged {purged} expired blacklisted tokens")
+    return purged
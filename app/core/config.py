@@ -32,8 +32,65 @@ class Settings(BaseSettings):
 
     email_expire_minutes: int
 
+    # outgoing mail dispatcher
+    email_start_tls: bool = True
+    email_timeout: float = 30
+    email_pool_size: int = 2
+    email_queue_size: int = 1000
+    email_max_retries: int = 3
+    email_retry_backoff: float = 1
+
     blacklisted_token_expire_minutes: int
 
+    # connection pool profile, overridden per environment below
+    db_echo: bool = False
+    db_null_pool: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # adds X-DB-* query headers to every response
+    debug: bool = False
+    # identical statements per request before an N+1 warning is logged
+    n_plus_one_threshold: int = 10
+
+    principal_cache_size: int = 10000
+    principal_cache_ttl: float = 60
+    # serialized product and category lists, one entry per user and kind
+    list_cache_size: int = 10000
+    list_cache_ttl: float = 300
+
+    category_max_depth: int = 32
+
+    bulk_max_items: int = 50000
+    bulk_insert_batch_size: int = 1000
+
+    export_batch_size: int = 1000
+
+    import_batch_size: int = 5000
+    import_error_dir: Path = BASE_DIR.parent / "import_errors"
+    import_error_ttl_hours: int = 24
+    import_error_purge_interval_minutes: int = 60
+
+    # bcrypt threads per worker and how many calls may wait for one
+    password_workers: int = 4
+    password_max_queue: int = 256
+
+    token_purge_interval_minutes: int = 10
+    token_purge_batch_size: int = 5000
+
+    log_level: str = "WARNING"
+    log_file: str = "app.log"
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+    log_json: bool = False
+    log_queue_size: int = 10000
+    # at most log_sample_burst records per call site every log_sample_window seconds
+    log_sample_window: float = 10
+    log_sample_burst: int = 20
+
     class Config:
         env_file = ENV_PATH / ".env"
         extra = "allow"
@@ -42,10 +99,17 @@ class Settings(BaseSettings):
 class DevSettings(Settings):
     debug: bool = True
 
+    db_echo: bool = True
+    db_max_overflow: int = 5
+
 
 class ProdSettings(Settings):
     debug: bool = False
 
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 10
+
     class Config:
         env_file = ENV_PATH / ".env.prod"
 
@@ -53,10 +117,21 @@ class ProdSettings(Settings):
 class StageSettings(Settings):
     debug: bool = False
 
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 10
+
     class Config:
         env_file = ENV_PATH / ".env.stage"
 
 
+class TestSettings(Settings):
+    debug: bool = False
+
+    # test clients run each request on a fresh event loop
+    db_null_pool: bool = True
+
+
 def get_config():
     env = os.getenv("APP_ENV", "dev").lower()
     if env == Environments.DEVELOPMENT:
@@ -65,6 +140,8 @@ def get_config():
         return StageSettings()
     elif env == Environments.PRODUCTION:
         return ProdSettings()
+    elif env == Environments.TESTING:
+        return TestSettings()
     else:
         return Settings()  # default fallback
 
@@ -9,3 +9,29 @@ internal_server_exception = "Unexpected error occurred"
 item_invalid_data_exception = (
     "A database integrity error occurred. Please check your input and constraints."
 )
+
+invalid_cursor_exception = "Invalid pagination cursor"
+
+category_cycle_exception = (
+    "A category cannot be moved under itself or one of its subcategories"
+)
+
+duplicate_product_exception = (
+    "uq_product_name_category: a product with this name already exists in the category"
+)
+
+non_positive_price_exception = "chk_price_positive: price must be greater than 0"
+
+empty_filter_exception = "Provide ids or at least one filter"
+
+unsupported_import_format_exception = "Upload a .csv, .ndjson or .jsonl file"
+
+password_pool_busy_exception = "Too many password requests, try again shortly"
+
+email_queue_full_exception = "Too many emails waiting to be sent, try again shortly"
+
+
+def invalid_fields_exception(unknown, allowed):
+    if unknown:
+        return f"Unknown fields {', '.join(unknown)}; choose from {', '.join(allowed)}"
+    return f"Select at least one of {', '.join(allowed)}"
@@ -1,22 +1,24 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
 from typing import Annotated
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel.ext.asyncio.session import AsyncSession
 import jwt
 from jwt.exceptions import InvalidTokenError
 from ..database import get_session
 from ..models.user_model import User, Role
 from ..models.blacklistedtoken_model import BlacklistedToken
 from .config import settings
+from .revocation import revocation_cache
+from .principals import principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
 
 
-def get_current_user(
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], session: SessionDep
 ):
     try:
@@ -27,11 +29,15 @@ def get_current_user(
                 detail="Invalid token type: access token required",
             )
 
-        blacklisted = session.exec(
-            select(BlacklistedToken).where(
-                BlacklistedToken.access_token == data.get("jti")
-            )
-        ).first()
+        blacklisted = revocation_cache.is_revoked(data.get("jti"))
+        if blacklisted is None:
+            blacklisted = (
+                await session.exec(
+                    select(BlacklistedToken.id).where(
+                        BlacklistedToken.access_token == data.get("jti")
+                    )
+                )
+            ).first()
         if blacklisted:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token is blacklisted"
@@ -42,11 +48,20 @@ def get_current_user(
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-        user = session.exec(select(User).where(User.id == uuid)).first()
+        cached = principal_cache.get(uuid)
+        if cached is not None:
+            # attach a fresh copy so writes to current_user still flush as updates
+            user = User(**cached)
+            make_transient_to_detached(user)
+            session.add(user)
+            return user
+
+        user = (await session.exec(select(User).where(User.id == uuid))).first()
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
+        principal_cache.set(uuid, user.model_dump())
         return user
     except InvalidTokenError:
         raise HTTPException(
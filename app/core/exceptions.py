@@ -4,6 +4,13 @@ from .constants import (
     item_not_found_exception,
     item_invalid_data_exception,
     internal_server_exception,
+    invalid_cursor_exception,
+    category_cycle_exception,
+    empty_filter_exception,
+    unsupported_import_format_exception,
+    password_pool_busy_exception,
+    email_queue_full_exception,
+    invalid_fields_exception,
 )
 from .logers import logger
 
@@ -19,7 +26,7 @@ class ItemNotFoundException(HTTPException):
 class ItemInvalidDataException(HTTPException):
     def __init__(self, e: IntegrityError):
         message = item_invalid_data_exception
-        logger.warning(e.orig)
+        logger.warning(e.orig, extra={"exc_type": type(e.orig).__name__})
 
         super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
 
@@ -28,8 +35,80 @@ class InternalServerException(HTTPException):
     def __init__(self, e, file):
         message = internal_server_exception
         log = f"{e} in {file}"
-        logger.warning(log)
+        logger.warning(log, extra={"exc_type": type(e).__name__})
 
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=message
         )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        message = invalid_cursor_exception
+        logger.warning(message)
+
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+class CategoryCycleException(HTTPException):
+    def __init__(self):
+        message = category_cycle_exception
+        logger.warning(message)
+
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+class EmptyFilterException(HTTPException):
+    def __init__(self):
+        message = empty_filter_exception
+        logger.warning(message)
+
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+class UnsupportedImportFormatException(HTTPException):
+    def __init__(self):
+        message = unsupported_import_format_exception
+        logger.warning(message)
+
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+class PasswordPoolBusyException(HTTPException):
+    def __init__(self):
+        message = password_pool_busy_exception
+        logger.warning(message)
+
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=message,
+            headers={"Retry-After": "1"},
+        )
+
+
+class EmailQueueFullException(HTTPException):
+    def __init__(self):
+        message = email_queue_full_exception
+        logger.warning(message)
+
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=message,
+            headers={"Retry-After": "5"},
+        )
+
+
+class InvalidFieldsException(HTTPException):
+    def __init__(self, unknown: list[str], allowed: list[str]):
+        message = invalid_fields_exception(unknown, allowed)
+        logger.warning(message)
+
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
+# not an error: the client's copy is current, so the body is left out
+class NotModifiedException(HTTPException):
+    def __init__(self, etag: str):
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
@@ -0,0 +1,114 @@
+from uuid import UUID
+from fastapi import Response
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .cache import TTLCache
+from .config import settings
+from .listener import pg_listener
+from ..utils.etag import list_etag, check_etag
+from ..utils.serialization import row_serializer
+
+LIST_CHANGED_CHANNEL = "list_changed"
+PRODUCT_LIST = "product"
+CATEGORY_LIST = "category"
+
+
+# a list response as it goes on the wire, with the ETag of its rows
+class CachedList:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+
+    def to_response(self, if_none_match: str | None) -> Response:
+        check_etag(if_none_match, self.etag)
+        return Response(
+            self.body, media_type="application/json", headers={"ETag": self.etag}
+        )
+
+
+# serialized list responses keyed by "<kind>:<user id>"; the backend is
+# anything with the TTLCache interface. Entries are only read and written
+# while notifications are being received, and a list is only stored when
+# no invalidation for its key arrived while its rows were being read
+class ListCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.ready = False
+        self.epoch = 0
+        self.generations: dict[str, int] = {}
+
+    @staticmethod
+    def key(kind: str, user_id: UUID) -> str:
+        return f"{kind}:{user_id}"
+
+    # take before querying and hand to set
+    def generation(self, kind: str, user_id: UUID) -> tuple[int, int]:
+        return self.epoch, self.generations.get(ListCache.key(kind, user_id), 0)
+
+    def get(self, kind: str, user_id: UUID) -> CachedList | None:
+        if not self.ready:
+            return None
+        return self.backend.get(ListCache.key(kind, user_id))
+
+    @staticmethod
+    def build(rows, schema, fields: tuple[str, ...] | None = None) -> CachedList:
+        body = row_serializer(schema, fields).dumps_many(rows)
+        return CachedList(body, list_etag(rows))
+
+    def set(
+        self, kind: str, user_id: UUID, rows, schema, generation: tuple[int, int]
+    ) -> CachedList:
+        cached = ListCache.build(rows, schema)
+        # a write may have committed after the rows were read
+        if self.ready and generation == self.generation(kind, user_id):
+            self.backend.set(ListCache.key(kind, user_id), cached)
+        return cached
+
+    def invalidate(self, key: str):
+        # a new epoch also outdates every generation handed out so far
+        if len(self.generations) >= self.backend.max_size:
+            self.clear()
+        self.generations[key] = self.generations.get(key, 0) + 1
+        self.backend.invalidate(key)
+
+    def clear(self):
+        self.epoch += 1
+        self.generations.clear()
+        self.backend.clear()
+
+    # reads that started while disconnected may have missed a notification
+    async def resync(self):
+        self.clear()
+        self.ready = True
+
+    def disconnect(self):
+        self.ready = False
+        self.clear()
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+list_cache = ListCache(
+    TTLCache(max_size=settings.list_cache_size, ttl=settings.list_cache_ttl)
+)
+
+pg_listener.subscribe(LIST_CHANGED_CHANNEL, list_cache.invalidate)
+pg_listener.on_connect(list_cache.resync)
+# notifications may be missed while disconnected
+pg_listener.on_disconnect(list_cache.disconnect)
+
+
+async def publish_list_change(session: AsyncSession, kind: str, *user_ids: UUID):
+    # call before commit; every worker, this one included, drops the entries
+    # again once the transaction commits
+    for user_id in set(user_ids):
+        key = ListCache.key(kind, user_id)
+        await session.exec(
+            text("SELECT pg_notify(:channel, :payload)").bindparams(
+                channel=LIST_CHANGED_CHANNEL, payload=key
+            )
+        )
+        list_cache.invalidate(key)
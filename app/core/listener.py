@@ -0,0 +1,77 @@
+import asyncio
+import asyncpg
+from .config import settings
+from .logers import logger
+
+
+# one LISTEN connection per worker, fanning notifications out to handlers
+class PgListener:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.handlers = {}
+        self.connect_handlers = []
+        self.disconnect_handlers = []
+        self.connection = None
+        self._task = None
+
+    def subscribe(self, channel: str, handler):
+        self.handlers[channel] = handler
+
+    def on_connect(self, handler):
+        self.connect_handlers.append(handler)
+
+    def on_disconnect(self, handler):
+        self.disconnect_handlers.append(handler)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        delay = 1
+        while True:
+            closed = asyncio.Event()
+            try:
+                self.connection = await asyncpg.connect(self.dsn)
+                self.connection.add_termination_listener(lambda conn: closed.set())
+                for channel in self.handlers:
+                    await self.connection.add_listener(channel, self._dispatch)
+                # handlers resync here, so anything sent before LISTEN is not lost
+                for handler in self.connect_handlers:
+                    await handler()
+                delay = 1
+                await closed.wait()
+                logger.warning("Notification listener connection lost")
+            except asyncio.CancelledError:
+                await self._close()
+                raise
+            except Exception as e:
+                logger.warning(f"Notification listener failed: {e}")
+            await self._close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _close(self):
+        for handler in self.disconnect_handlers:
+            handler()
+        if self.connection is not None and not self.connection.is_closed():
+            await self.connection.close()
+        self.connection = None
+
+    def _dispatch(self, connection, pid, channel, payload):
+        try:
+            self.handlers[channel](payload)
+        except Exception as e:
+            logger.warning(f"Bad notification on {channel}: {e}")
+
+
+pg_listener = PgListener(settings.database_url)
@@ -1,17 +1,104 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from .config import settings
 
-logger = logging.getLogger(__name__)
-file_handler = logging.FileHandler("app.log", mode="a", encoding="utf-8")
-console_handler = logging.StreamHandler()
 
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data)
+
+
+# lets through log_sample_burst records per call site every log_sample_window
+# seconds and reports how many were dropped once the window rolls over;
+# errors are never sampled. Call sites that wrap other exceptions pass
+# extra={"exc_type": ...} so one kind of failure cannot hide the others
+class SamplingFilter(logging.Filter):
+    def __init__(self, window: float, burst: int):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.sites = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR or self.burst <= 0:
+            return True
+        key = (record.pathname, record.lineno, getattr(record, "exc_type", None))
+        now = time.monotonic()
+        with self.lock:
+            started, count, suppressed = self.sites.get(key, (now, 0, 0))
+            if now - started >= self.window:
+                started, count = now, 0
+            if count >= self.burst:
+                self.sites[key] = (started, count, suppressed + 1)
+                return False
+            self.sites[key] = (started, count + 1, 0)
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} similar suppressed)"
+            record.args = None
+        return True
+
+
+# never blocks the caller; when the writer falls behind records are dropped
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-formatter = logging.Formatter(
-    "{asctime} - {levelname} - {message}",
-    style="{",
-    datefmt="%Y-%m-%d %H:%M",
-)
 
+if settings.log_json:
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter(
+        "{asctime} - {levelname} - {message}",
+        style="{",
+        datefmt="%Y-%m-%d %H:%M",
+    )
+
+file_handler = RotatingFileHandler(
+    settings.log_file,
+    maxBytes=settings.log_max_bytes,
+    backupCount=settings.log_backup_count,
+    encoding="utf-8",
+)
+console_handler = logging.StreamHandler()
 file_handler.setFormatter(formatter)
 console_handler.setFormatter(formatter)
+
+# the request path only puts records on a queue, a background thread
+# formats them and does the disk and console I/O
+log_queue = queue.Queue(maxsize=settings.log_queue_size)
+queue_handler = DroppingQueueHandler(log_queue)
+queue_handler.addFilter(
+    SamplingFilter(settings.log_sample_window, settings.log_sample_burst)
+)
+listener = QueueListener(log_queue, file_handler, console_handler)
+
+logger = logging.getLogger(__name__)
+logger.setLevel(settings.log_level)
+logger.addHandler(queue_handler)
+
+listener.start()
+atexit.register(listener.stop)
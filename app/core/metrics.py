@@ -0,0 +1,116 @@
+import time
+from contextvars import ContextVar
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from .config import settings
+from .logers import logger
+
+# labels come from route templates, never raw paths, so the number of series
+# stays bounded by the routes that exist
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route, method and status",
+    ["method", "route", "status"],
+)
+LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and method",
+    ["method", "route"],
+)
+DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request",
+    ["method", "route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+
+UNMATCHED_ROUTE = "<unmatched>"
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+# per-request accumulator, filled by the cursor events below; identical
+# statement text with different parameters is what an N+1 loop looks like
+class RequestStats:
+    __slots__ = ("db_time", "queries", "statements")
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = {}
+
+    def most_repeated(self) -> tuple[str | None, int]:
+        if not self.statements:
+            return None, 0
+        statement = max(self.statements, key=self.statements.get)
+        return statement, self.statements[statement]
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_time += time.perf_counter() - context.query_started
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.debug:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.queries)
+                    headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.2f}"
+                    headers["X-DB-Max-Repeat"] = str(stats.most_repeated()[1])
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            request_stats.reset(token)
+            # the router leaves the matched route in the scope
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"] if scope["method"] in METHODS else "OTHER"
+            REQUESTS.labels(method, path, str(status_code)).inc()
+            LATENCY.labels(method, path).observe(elapsed)
+            DB_TIME.labels(method, path).observe(stats.db_time)
+            statement, repeats = stats.most_repeated()
+            if repeats >= settings.n_plus_one_threshold:
+                logger.warning(
+                    f"Possible N+1 on {method} {path}: statement ran {repeats} "
+                    f"times: {' '.join(statement.split())[:300]}"
+                )
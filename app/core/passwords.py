@@ -0,0 +1,86 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+from .config import settings
+from .exceptions import PasswordPoolBusyException
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop;
+# callers beyond password_max_queue are turned away instead of piling up
+class PasswordPool:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password"
+        )
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    async def run(self, func, *args):
+        with self.lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusyException()
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        submitted = time.perf_counter()
+
+        def job():
+            wait = time.perf_counter() - submitted
+            with self.lock:
+                self.queued -= 1
+                self.running += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            try:
+                return func(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+
+        future = self.executor.submit(job)
+        future.add_done_callback(self.dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    # a caller cancelled while its job waited takes the job with it,
+    # job() never runs to take it off the queue
+    def dequeue_cancelled(self, future):
+        if future.cancelled():
+            with self.lock:
+                self.queued -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(pwd_context.verify, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self.lock:
+            started = self.completed + self.running
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": (self.total_wait / started * 1000) if started else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+password_pool = PasswordPool(settings.password_workers, settings.password_max_queue)
@@ -0,0 +1,77 @@
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from .config import settings
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+
+pool_stats = PoolStats()
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    # times every checkout so pool starvation shows up as wait time
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record(time.perf_counter() - start)
+
+
+def get_engine_options() -> dict:
+    if settings.db_null_pool:
+        return {"echo": settings.db_echo, "poolclass": NullPool}
+    return {
+        "echo": settings.db_echo,
+        "poolclass": MonitoredQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def get_pool_status(pool) -> dict:
+    status = {
+        "pool_class": type(pool).__name__,
+        "size": 0,
+        "checked_out": 0,
+        "idle": 0,
+        "overflow": 0,
+        "max_overflow": 0,
+        "timeout": 0.0,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.db_max_overflow,
+            timeout=pool.timeout(),
+        )
+    checkouts = pool_stats.checkouts
+    status.update(
+        checkouts=checkouts,
+        timeouts=pool_stats.timeouts,
+        avg_wait_ms=(pool_stats.total_wait / checkouts * 1000) if checkouts else 0.0,
+        max_wait_ms=pool_stats.max_wait * 1000,
+    )
+    return status
@@ -0,0 +1,62 @@
+from uuid import UUID
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .cache import TTLCache
+from .config import settings
+from .listener import pg_listener
+
+USER_CHANGED_CHANNEL = "user_changed"
+
+# column values of authenticated users, keyed by the uuid claim of the token;
+# like the list cache it is only read and written while notifications are
+# being received, other workers' changes would go unnoticed otherwise
+class PrincipalCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.ready = False
+
+    def get(self, user_id: str) -> dict | None:
+        if not self.ready:
+            return None
+        return self.backend.get(user_id)
+
+    def set(self, user_id: str, values: dict):
+        if self.ready:
+            self.backend.set(user_id, values)
+
+    def invalidate(self, user_id: str):
+        self.backend.invalidate(user_id)
+
+    def clear(self):
+        self.backend.clear()
+
+    async def resync(self):
+        self.clear()
+        self.ready = True
+
+    def disconnect(self):
+        self.ready = False
+        self.clear()
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+principal_cache = PrincipalCache(
+    TTLCache(max_size=settings.principal_cache_size, ttl=settings.principal_cache_ttl)
+)
+
+pg_listener.subscribe(USER_CHANGED_CHANNEL, principal_cache.invalidate)
+pg_listener.on_connect(principal_cache.resync)
+# notifications may be missed while disconnected
+pg_listener.on_disconnect(principal_cache.disconnect)
+
+
+async def publish_user_change(session: AsyncSession, user_id: UUID):
+    # call before commit; every worker drops the entry once the transaction commits
+    await session.exec(
+        text("SELECT pg_notify(:channel, :payload)").bindparams(
+            channel=USER_CHANGED_CHANNEL, payload=str(user_id)
+        )
+    )
+    principal_cache.invalidate(str(user_id))
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timezone
+from sqlmodel import select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database import engine
+from ..models.blacklistedtoken_model import BlacklistedToken
+from .listener import pg_listener
+
+TOKEN_REVOKED_CHANNEL = "token_revoked"
+
+
+# revoked access-token jtis kept in memory and in sync through NOTIFY;
+# is_revoked returns None until synchronised so callers fall back to the table
+class TokenRevocationCache:
+    def __init__(self):
+        self.revoked: dict[str, datetime] = {}
+        self.ready = False
+        self.prune_at = 1024
+
+    def add(self, jti: str, expires_at: datetime):
+        self.revoked[jti] = expires_at
+        if len(self.revoked) >= self.prune_at:
+            self.prune()
+            self.prune_at = max(1024, 2 * len(self.revoked))
+
+    def is_revoked(self, jti: str) -> bool | None:
+        if not self.ready:
+            return None
+        expires_at = self.revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= datetime.now(timezone.utc):
+            # token itself has expired by now, jwt.decode rejects it anyway
+            del self.revoked[jti]
+            return False
+        return True
+
+    def prune(self):
+        now = datetime.now(timezone.utc)
+        self.revoked = {
+            jti: expires_at
+            for jti, expires_at in self.revoked.items()
+            if expires_at > now
+        }
+
+    async def reload(self):
+        now = datetime.now(timezone.utc)
+        async with AsyncSession(engine) as session:
+            rows = (
+                await session.exec(
+                    select(
+                        BlacklistedToken.access_token, BlacklistedToken.expires_at
+                    ).where(BlacklistedToken.expires_at > now)
+                )
+            ).all()
+        # merged, notifications handled while the query ran are kept
+        self.revoked.update(rows)
+        self.ready = True
+
+    def invalidate(self):
+        self.ready = False
+
+    def handle_notification(self, payload: str):
+        data = json.loads(payload)
+        self.add(data["jti"], datetime.fromisoformat(data["expires_at"]))
+
+
+revocation_cache = TokenRevocationCache()
+
+pg_listener.subscribe(TOKEN_REVOKED_CHANNEL, revocation_cache.handle_notification)
+pg_listener.on_connect(revocation_cache.reload)
+pg_listener.on_disconnect(revocation_cache.invalidate)
+
+
+async def publish_revocation(session: AsyncSession, jti: str, expires_at: datetime):
+    # delivered to every worker (this one included) when the transaction commits
+    payload = json.dumps({"jti": jti, "expires_at": expires_at.isoformat()})
+    await session.exec(
+        text("SELECT pg_notify(:channel, :payload)").bindparams(
+            channel=TOKEN_REVOKED_CHANNEL, payload=payload
+        )
+    )
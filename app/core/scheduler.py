@@ -0,0 +1,43 @@
+from datetime import timedelta
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from .auth import purge_expired_tokens
+from .config import settings
+from ..utils.importer import purge_import_errors
+
+# AsyncIOScheduler sticks to the loop it was first started on, so every
+# application start gets a fresh one
+scheduler: AsyncIOScheduler | None = None
+
+
+def start_scheduler():
+    global scheduler
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    scheduler.add_job(
+        purge_expired_tokens,
+        "interval",
+        minutes=settings.token_purge_interval_minutes,
+        id="purge_expired_tokens",
+        max_instances=1,
+        coalesce=True,
+    )
+    # plain function, so it runs in the scheduler's thread pool
+    scheduler.add_job(
+        purge_import_errors,
+        "interval",
+        minutes=settings.import_error_purge_interval_minutes,
+        args=[
+            settings.import_error_dir,
+            timedelta(hours=settings.import_error_ttl_hours),
+        ],
+        id="purge_import_errors",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+
+
+def stop_scheduler():
+    global scheduler
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+        scheduler = None
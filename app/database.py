@@ -1,11 +1,15 @@
-from sqlmodel import Session, create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .core.config import settings
+from .core.pool import get_engine_options
 
-DATABASE_URL = settings.database_url
+DATABASE_URL = settings.database_url.replace(
+    "postgresql://", "postgresql+asyncpg://", 1
+)
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **get_engine_options())
 
 
-def get_session():
-    with Session(engine) as session:
+async def get_session():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
         yield session
@@ -1,8 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from .routes import api
+from .core.listener import pg_listener
+from .core.metrics import MetricsMiddleware
+from .core.scheduler import start_scheduler, stop_scheduler
+from .utils.email_dispatcher import email_dispatcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pg_listener.start()
+    start_scheduler()
+    await email_dispatcher.start()
+    yield
+    await email_dispatcher.stop()
+    stop_scheduler()
+    await pg_listener.stop()
+
 
 app = FastAPI(
     title="This is basic CRUD operation Task with Authentication & Authorization",
+    lifespan=lifespan,
 )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(api.router)
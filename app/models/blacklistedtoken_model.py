@@ -1,15 +1,28 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import DateTime
 from datetime import datetime, timezone, timedelta
 from uuid import UUID, uuid4
 from ..core.config import settings
 
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def default_expires_at() -> datetime:
+    return utc_now() + timedelta(minutes=settings.blacklisted_token_expire_minutes)
+
+
 class BlacklistedToken(SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     access_token: str = Field(unique=True, index=True)
     refresh_token: str = Field(unique=True, index=True)
-    blacklisted_at: datetime = Field(default=datetime.now(timezone.utc))
+    blacklisted_at: datetime = Field(
+        default_factory=utc_now, sa_type=DateTime(timezone=True)
+    )
+    # the purge job deletes by this column
     expires_at: datetime = Field(
-        default=datetime.now(timezone.utc)
-        + timedelta(minutes=settings.blacklisted_token_expire_minutes)
+        default_factory=default_expires_at,
+        sa_type=DateTime(timezone=True),
+        index=True,
     )
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index, String, text
 from uuid import UUID, uuid4
 from .product_model import Product
 
@@ -7,6 +7,9 @@ from .product_model import Product
 class Category(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("name", "user_id", name="uq_category_name_user"),
+        Index("ix_category_user_id_path", "user_id", "path"),
+        # children lookups: parent filter, recursive subtree join, cascade
+        Index("ix_category_parent_id_user_id", "parent_id", "user_id"),
     )
 
     id: UUID | None = Field(default_factory=uuid4, primary_key=True)
@@ -16,5 +19,13 @@ class Category(SQLModel, table=True):
     parent_id: UUID | None = Field(
         default=None, foreign_key="category.id", ondelete="CASCADE"
     )
-    subcategories: list["Category"] = Relationship()
-    products: list["Product"] = Relationship()
+    # materialized path "/<root id>/.../<own id>/"; C collation keeps prefix
+    # ranges usable on a plain btree index
+    path: str = Field(sa_type=String(collation="C"), nullable=False)
+    # bumped by every ORM and Core UPDATE, moves included; backs the ETag of the row
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": text("1"), "onupdate": text("version + 1")},
+    )
+    subcategories: list["Category"] = Relationship(passive_deletes=True)
+    products: list["Product"] = Relationship(passive_deletes=True)
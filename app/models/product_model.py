@@ -1,13 +1,38 @@
 from sqlmodel import SQLModel, Field
-from sqlalchemy import UniqueConstraint, CheckConstraint
+from sqlalchemy import UniqueConstraint, CheckConstraint, Index, Column, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from uuid import UUID, uuid4
 
+# kept up to date by postgres; names rank above descriptions
+search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        "setweight(to_tsvector('english', name), 'A') || "
+        "setweight(to_tsvector('english', description), 'B')",
+        persisted=True,
+    ),
+)
+
 
 class Product(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("name", "category_id", "user_id", name="uq_product_name_category"),
         CheckConstraint("price > 0", name="chk_price_positive"),
+        # keyset pagination sort orders, id is the tiebreaker
+        Index("ix_product_user_id_id", "user_id", "id"),
+        Index("ix_product_user_id_name_id", "user_id", "name", "id"),
+        Index("ix_product_user_id_price_id", "user_id", "price", "id"),
+        # category filter with an optional price range; leading category_id
+        # also serves the cascade when a category is deleted
+        Index(
+            "ix_product_category_id_user_id_price", "category_id", "user_id", "price"
+        ),
+        Index("ix_product_search_vector", "search_vector", postgresql_using="gin"),
     )
+    # only search reads the vector, plain selects leave it out
+    __mapper_args__ = {"properties": {"search_vector": deferred(search_vector)}}
 
     id: UUID | None = Field(default_factory=uuid4, primary_key=True)
     name: str
@@ -16,3 +41,9 @@ class Product(SQLModel, table=True):
 
     user_id: UUID | None = Field(foreign_key="people.id", ondelete="CASCADE")
     category_id: UUID | None = Field(foreign_key="category.id", ondelete="CASCADE")
+    search_vector: str | None = Field(default=None, sa_column=search_vector)
+    # bumped by every ORM and Core UPDATE, backs the ETag of the row
+    version: int = Field(
+        default=1,
+        sa_column_kwargs={"server_default": text("1"), "onupdate": text("version + 1")},
+    )
@@ -19,7 +19,7 @@ router = APIRouter()
 async def register_first_admin(
     user: UserIn, admin_service: Annotated[AdminService, Depends(get_admin_service)]
 ):
-    return admin_service.register_first_admin(user)
+    return await admin_service.register_first_admin(user)
 
 
 @router.post("/registers", response_model=UserOut, summary="Register a new user/admin")
@@ -29,7 +29,7 @@ async def register_user(
     admin_service: Annotated[AdminService, Depends(get_admin_service)],
     current_user: Annotated[User, Depends(admin_access)],
 ):
-    return admin_service.register_user(user, role, current_user)
+    return await admin_service.register_user(user, role, current_user)
 
 
 @router.get("/get-all", response_model=list[UserOut], summary="Get all users/admins")
@@ -40,4 +40,4 @@ async def get_all_users(
     skip: int = Query(default=0, ge=0),
     role: str = Query(enum=["user", "admin", "all"], description="Filter by user role"),
 ):
-    return admin_service.get_all_users(current_user, limit, skip, role)
+    return await admin_service.get_all_users(current_user, limit, skip, role)
@@ -3,6 +3,8 @@ from .category_route import router as category
 from .product_route import router as product
 from .admin_route import router as admin
 from .users_route import router as users
+from .monitoring_route import router as monitoring
+from .metrics_route import router as metrics
 
 router = APIRouter()
 
@@ -10,3 +12,5 @@ router.include_router(product, prefix="/product", tags=["Product"])
 router.include_router(category, prefix="/category", tags=["Category"])
 router.include_router(admin, tags=["admin"])
 router.include_router(users)
+router.include_router(monitoring, prefix="/monitoring", tags=["Monitoring"])
+router.include_router(metrics, tags=["Monitoring"])
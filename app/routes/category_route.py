@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import StreamingResponse
 from typing import Annotated
 from uuid import UUID
 
@@ -6,12 +7,16 @@ from ..schemas.category_schema import (
     CreateCategory,
     ReadCategory,
     UpdateCategory,
+    MoveCategory,
     NestedCategoryResponse,
 )
+from ..schemas.common_schema import CountResult
 from ..models.user_model import User
 from ..core.dependencies import admin_access, get_current_user, SessionDep
 
 from ..services.category_service import CategoryService
+from ..utils.etag import check_etag, list_etag, row_etag
+from ..utils.serialization import row_serializer, json_response, select_fields
 
 
 def get_category_service_admin(
@@ -28,6 +33,8 @@ def get_category_service_all(
 
 router = APIRouter()
 
+category_rows = row_serializer(ReadCategory)
+
 
 # Create a category
 @router.post(
@@ -40,7 +47,7 @@ async def create_category(
     category: CreateCategory,
     category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
 ) -> dict[str, str | int | None]:
-    return category_service.create_category(category)
+    return await category_service.create_category(category)
 
 
 @router.post(
@@ -54,7 +61,7 @@ async def create_category_for_user(
     category: CreateCategory,
     category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
 ):
-    return category_service.create_category_for_user(user_id,category)
+    return await category_service.create_category_for_user(user_id,category)
 
 
 # Get all categories
@@ -66,8 +73,17 @@ async def create_category_for_user(
 )
 async def get_categories(
     category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name",
+    ),
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> list[dict[str, str | int | None]]:
-    return category_service.get_categories()
+    # the full list is served from the per-user list cache, already serialized
+    categories = await category_service.get_categories(
+        select_fields(ReadCategory, fields)
+    )
+    return categories.to_response(if_none_match)
 
 
 # Get all categories for admin
@@ -79,8 +95,59 @@ async def get_categories(
 )
 async def get_all_categories(
     category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name",
+    ),
 ) -> list[dict[str, str | int | None]]:
-    return category_service.get_all_categories()
+    selected = select_fields(ReadCategory, fields)
+    categories = await category_service.get_all_categories(selected)
+    return json_response(row_serializer(ReadCategory, selected).dump_many(categories))
+
+
+# Count categories of all users for admin
+@router.get(
+    "/all/count",
+    summary="Count all categories for admin",
+    description="Count the categories of all users. With approximate=true the planner's estimate is returned without scanning the table.",
+    response_model=CountResult,
+)
+async def count_all_categories(
+    category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
+    approximate: bool = False,
+) -> CountResult:
+    return await category_service.count_all_categories(approximate)
+
+
+# Export categories as NDJSON
+@router.get(
+    "/export",
+    summary="Export categories",
+    description="Stream all categories of the user as newline-delimited JSON.",
+    response_class=StreamingResponse,
+)
+async def export_categories(
+    category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        category_service.export_categories(), media_type="application/x-ndjson"
+    )
+
+
+# Export categories of all users as NDJSON
+@router.get(
+    "/all/export",
+    summary="Export all categories for admin",
+    description="Stream the categories of all users as newline-delimited JSON.",
+    response_class=StreamingResponse,
+)
+async def export_all_categories(
+    category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        category_service.export_categories(all_users=True),
+        media_type="application/x-ndjson",
+    )
 
 
 # Get categories after validation
@@ -94,9 +161,40 @@ async def get_pagination_categories(
     category_service: Annotated[CategoryService, Depends(get_category_service_all)],
     page: int = 1,
     size: int = 10,
-    parent_id: int | None = None,
+    parent_id: UUID | None = None,
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name",
+    ),
+    with_total: bool = Query(
+        default=False,
+        description="Send the number of matching items in X-Total-Count",
+    ),
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> list[dict[str, str | int | None]]:
-    return category_service.get_pagination_categories(page, size, parent_id)
+    selected = select_fields(ReadCategory, fields)
+    categories, total = await category_service.get_pagination_categories(
+        page, size, parent_id, selected, with_total
+    )
+    etag = list_etag(categories, total)
+    check_etag(if_none_match, etag)
+    return json_response(
+        row_serializer(ReadCategory, selected).dump_many(categories), etag, total
+    )
+
+
+# Count categories matching the pagination filters
+@router.get(
+    "/count",
+    summary="Count categories",
+    description="Count the categories matching the same filters as /pagination, without fetching them.",
+    response_model=CountResult,
+)
+async def count_categories(
+    category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+    parent_id: UUID | None = None,
+) -> CountResult:
+    return await category_service.count_categories(parent_id)
 
 
 # Get nested category
@@ -110,21 +208,70 @@ async def nested_category(
     category_id: UUID,
     category_service: Annotated[CategoryService, Depends(get_category_service_all)],
 ) -> NestedCategoryResponse:
-    return category_service.nested_category(category_id)
+    # the service builds the tree as plain dicts in the response shape
+    return json_response(await category_service.nested_category(category_id))
+
+
+# Get ancestors of a category
+@router.get(
+    "/{category_id}/ancestors",
+    summary="Get ancestors of a category",
+    description="Retrieve the chain of parent categories, from the root down to the direct parent.",
+    response_model=list[ReadCategory],
+)
+async def get_ancestors(
+    category_id: UUID,
+    category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+) -> list[dict[str, str | int | None]]:
+    ancestors = await category_service.get_ancestors(category_id)
+    return json_response(category_rows.dump_many(ancestors))
+
+
+# Get descendants of a category
+@router.get(
+    "/{category_id}/descendants",
+    summary="Get descendants of a category",
+    description="Retrieve every category below the given one as a flat list.",
+    response_model=list[ReadCategory],
+)
+async def get_descendants(
+    category_id: UUID,
+    category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+) -> list[dict[str, str | int | None]]:
+    descendants = await category_service.get_descendants(category_id)
+    return json_response(category_rows.dump_many(descendants))
+
+
+# Move a category with its subtree
+@router.put(
+    "/{category_id}/parent",
+    summary="Move a category under a new parent",
+    description="Reparents the category together with all of its subcategories. A null parent_id makes it a root category.",
+    response_model=ReadCategory,
+)
+async def move_category(
+    category_id: UUID,
+    move: MoveCategory,
+    category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
+) -> dict[str, str | int | None]:
+    return await category_service.move_category(category_id, move.parent_id)
 
 
 # Get a category by ID
 @router.get(
     "/{category_id}",
     summary="Get a category by ID",
-    description="Retrieve the details of a category by its ID.",
+    description="Retrieve the details of a category by its ID. Send the returned ETag in If-None-Match to get 304 while it is unchanged.",
     response_model=ReadCategory,
 )
 async def read_category(
     category_id: UUID,
     category_service: Annotated[CategoryService, Depends(get_category_service_all)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> dict[str, str | int | None]:
-    return category_service.read_category(category_id)
+    category = await category_service.read_category(category_id, if_none_match)
+    # a matching If-None-Match was already answered by the service
+    return json_response(category_rows.dump(category), row_etag(category.id, category.version))
 
 
 @router.put(
@@ -138,7 +285,7 @@ async def update_category(
     category_update: UpdateCategory,
     category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
 ) -> dict[str, str | int | None]:
-    return category_service.update_category(category_id, category_update)
+    return await category_service.update_category(category_id, category_update)
 
 
 @router.delete(
@@ -150,4 +297,4 @@ async def delete_category(
     category_id: UUID,
     category_service: Annotated[CategoryService, Depends(get_category_service_admin)],
 ) -> None:
-    return category_service.delete_category(category_id)
+    return await category_service.delete_category(category_id)
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+
+router = APIRouter()
+
+
+# Prometheus scrape endpoint
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Request counts, latency and DB time histograms per route and the in-flight requests, in Prometheus text format.",
+    response_class=Response,
+)
+async def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends
+from typing import Annotated
+
+from ..models.user_model import User
+from ..schemas.monitoring_schema import (
+    PoolStatus,
+    CacheStats,
+    PasswordPoolStats,
+    EmailStats,
+)
+from ..core.dependencies import admin_access
+from ..core.pool import get_pool_status
+from ..core.principals import principal_cache
+from ..core.list_cache import list_cache
+from ..core.passwords import password_pool
+from ..utils.email_dispatcher import email_dispatcher
+from ..database import engine
+
+
+router = APIRouter()
+
+
+# Get connection pool statistics
+@router.get(
+    "/pool",
+    summary="Get database pool statistics",
+    description="Returns checked-out, idle and overflow connections with checkout wait times.",
+    response_model=PoolStatus,
+)
+async def pool_status(current_user: Annotated[User, Depends(admin_access)]):
+    return get_pool_status(engine.pool)
+
+
+# Get authenticated principal cache statistics
+@router.get(
+    "/principal-cache",
+    summary="Get principal cache statistics",
+    description="Returns size, hit/miss and eviction counters of the authenticated user cache.",
+    response_model=CacheStats,
+)
+async def principal_cache_stats(current_user: Annotated[User, Depends(admin_access)]):
+    return principal_cache.stats()
+
+
+# Get list response cache statistics
+@router.get(
+    "/list-cache",
+    summary="Get list cache statistics",
+    description="Returns size, hit/miss and eviction counters of the per-user product and category list cache.",
+    response_model=CacheStats,
+)
+async def list_cache_stats(current_user: Annotated[User, Depends(admin_access)]):
+    return list_cache.stats()
+
+
+# Get password hashing pool statistics
+@router.get(
+    "/password-pool",
+    summary="Get password pool statistics",
+    description="Returns queue depth, running jobs, rejections and queue wait times of the bcrypt worker pool.",
+    response_model=PasswordPoolStats,
+)
+async def password_pool_stats(current_user: Annotated[User, Depends(admin_access)]):
+    return password_pool.stats()
+
+
+# Get outgoing email statistics
+@router.get(
+    "/email",
+    summary="Get email dispatcher statistics",
+    description="Returns queued, in-flight, sent, failed and retried emails and the open SMTP connections.",
+    response_model=EmailStats,
+)
+async def email_stats(current_user: Annotated[User, Depends(admin_access)]):
+    return email_dispatcher.stats()
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Body, UploadFile, Header
+from fastapi.responses import StreamingResponse, FileResponse
 from typing import Annotated
 from uuid import UUID
 
-from ..schemas.product_schema import CreateProduct, ReadProduct, UpdateProduct
+from ..schemas.product_schema import (
+    CreateProduct,
+    ReadProduct,
+    UpdateProduct,
+    ProductPage,
+    ProductSortField,
+    SortOrder,
+    BulkCreateResult,
+    BulkUpdateProducts,
+    BulkResult,
+    ProductFilter,
+    ImportResult,
+)
+from ..schemas.common_schema import CountResult
 
 from ..services.product_service import ProductService
+from ..utils.etag import check_etag, list_etag, row_etag
+from ..utils.serialization import row_serializer, json_response, select_fields
 from ..core.dependencies import get_current_user, SessionDep, admin_access
 from ..models.user_model import User
+from ..core.config import settings
 
 
 def get_product_service(
@@ -15,8 +32,16 @@ def get_product_service(
     return ProductService(session, current_user)
 
 
+def get_product_service_admin(
+    session: SessionDep, current_user: User = Depends(admin_access)
+) -> ProductService:
+    return ProductService(session, current_user)
+
+
 router = APIRouter()
 
+product_rows = row_serializer(ReadProduct)
+
 
 # Create a product
 @router.post(
@@ -29,7 +54,50 @@ async def create_product(
     product: CreateProduct,
     product_service: Annotated[ProductService, Depends(get_product_service)],
 ) -> dict[str, str | int]:
-    return product_service.create_product(product)
+    return await product_service.create_product(product)
+
+
+# Create many products at once
+@router.post(
+    "/bulk",
+    summary="Create products in bulk",
+    description="Validates every item on its own and inserts the valid ones in batched multi-row INSERTs within one transaction. Returns the created count and per-item errors.",
+    response_model=BulkCreateResult,
+)
+async def create_products(
+    items: Annotated[list[dict], Body(max_length=settings.bulk_max_items)],
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> BulkCreateResult:
+    return await product_service.create_products(items)
+
+
+# Import products from a CSV or NDJSON file
+@router.post(
+    "/import",
+    summary="Import products from a file",
+    description="Reads an uploaded .csv or .ndjson file row by row, loads the valid rows with COPY and merges them into the products. Rejected rows are listed in a downloadable error file.",
+    response_model=ImportResult,
+)
+async def import_products(
+    file: UploadFile,
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> ImportResult:
+    return await product_service.import_products(file)
+
+
+# Download the rejected rows of an import
+@router.get(
+    "/import/{import_id}/errors",
+    summary="Download import errors",
+    description="Returns a CSV file with the line number and reason of every row rejected by an import.",
+    response_class=FileResponse,
+)
+async def get_import_errors(
+    import_id: UUID,
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> FileResponse:
+    path = product_service.get_import_errors(import_id)
+    return FileResponse(path, media_type="text/csv", filename=f"{import_id}.csv")
 
 
 # Get all products
@@ -41,8 +109,15 @@ async def create_product(
 )
 async def get_products(
     product_service: Annotated[ProductService, Depends(get_product_service)],
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name,price",
+    ),
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> list[dict[str, str | int]]:
-    return product_service.get_products()
+    # the full list is served from the per-user list cache, already serialized
+    products = await product_service.get_products(select_fields(ReadProduct, fields))
+    return products.to_response(if_none_match)
 
 
 # get all products for admin
@@ -53,9 +128,60 @@ async def get_products(
     response_model=list[ReadProduct],  
 )
 async def get_all_products(
-    product_service: Annotated[ProductService, Depends(admin_access)],
+    product_service: Annotated[ProductService, Depends(get_product_service_admin)],
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name,price",
+    ),
 ) -> list[dict[str, str | int]]:
-    return product_service.get_all_products()
+    selected = select_fields(ReadProduct, fields)
+    products = await product_service.get_all_products(selected)
+    return json_response(row_serializer(ReadProduct, selected).dump_many(products))
+
+
+# Count products of all users for admin
+@router.get(
+    "/all/count",
+    summary="Count all products for admin",
+    description="Count the products of all users. With approximate=true the planner's estimate is returned without scanning the table.",
+    response_model=CountResult,
+)
+async def count_all_products(
+    product_service: Annotated[ProductService, Depends(get_product_service_admin)],
+    approximate: bool = False,
+) -> CountResult:
+    return await product_service.count_all_products(approximate)
+
+
+# Export products as NDJSON
+@router.get(
+    "/export",
+    summary="Export products",
+    description="Stream all products of the user as newline-delimited JSON.",
+    response_class=StreamingResponse,
+)
+async def export_products(
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        product_service.export_products(), media_type="application/x-ndjson"
+    )
+
+
+# Export products of all users as NDJSON
+@router.get(
+    "/all/export",
+    summary="Export all products for admin",
+    description="Stream the products of all users as newline-delimited JSON.",
+    response_class=StreamingResponse,
+)
+async def export_all_products(
+    product_service: Annotated[ProductService, Depends(get_product_service_admin)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        product_service.export_products(all_users=True),
+        media_type="application/x-ndjson",
+    )
 
 
 # Get products after validation
@@ -69,27 +195,143 @@ async def get_pagination_products(
     product_service: Annotated[ProductService, Depends(get_product_service)],
     page: int = 1,
     size: int = 10,
-    category_id: int | None = None,
+    category_id: UUID | None = None,
     price_min: float | None = None,
     price_max: float | None = None,
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated fields to return, e.g. id,name,price",
+    ),
+    with_total: bool = Query(
+        default=False,
+        description="Send the number of matching items in X-Total-Count",
+    ),
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> list[dict[str, str | int]]:
-    return product_service.get_pagination_products(
-        page, size, category_id, price_min, price_max
+    selected = select_fields(ReadProduct, fields)
+    products, total = await product_service.get_pagination_products(
+        page, size, category_id, price_min, price_max, selected, with_total
+    )
+    etag = list_etag(products, total)
+    check_etag(if_none_match, etag)
+    return json_response(
+        row_serializer(ReadProduct, selected).dump_many(products), etag, total
+    )
+
+
+# Count products matching the pagination filters
+@router.get(
+    "/count",
+    summary="Count products",
+    description="Count the products matching the same filters as /pagination, without fetching them.",
+    response_model=CountResult,
+)
+async def count_products(
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+    category_id: UUID | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+) -> CountResult:
+    return await product_service.count_products(category_id, price_min, price_max)
+
+
+# Get products page by page with an opaque cursor
+@router.get(
+    "/cursor",
+    summary="Get products with cursor pagination",
+    description="Retrieve products sorted by id, name or price. Pass the returned next_cursor to fetch the following page.",
+    response_model=ProductPage,
+)
+async def get_cursor_products(
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+    size: int = Query(default=10, ge=1, le=100),
+    cursor: str | None = None,
+    sort_by: ProductSortField = ProductSortField.id,
+    order: SortOrder = SortOrder.asc,
+    category_id: UUID | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> ProductPage:
+    page = await product_service.get_cursor_products(
+        size, cursor, sort_by, order, category_id, price_min, price_max
     )
+    etag = list_etag(page["items"], page["next_cursor"])
+    check_etag(if_none_match, etag)
+    return json_response(
+        {
+            "items": product_rows.dump_many(page["items"]),
+            "next_cursor": page["next_cursor"],
+        },
+        etag,
+    )
+
+
+# Search products by name and description
+@router.get(
+    "/search",
+    summary="Search products",
+    description="Full-text search over product names and descriptions. Results are ranked, names weigh more than descriptions. Pass the returned next_cursor to fetch the following page.",
+    response_model=ProductPage,
+)
+async def search_products(
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+    q: str = Query(min_length=1, max_length=200),
+    size: int = Query(default=10, ge=1, le=100),
+    cursor: str | None = None,
+) -> ProductPage:
+    page = await product_service.search_products(q, size, cursor)
+    return json_response(
+        {
+            "items": product_rows.dump_many(page["items"]),
+            "next_cursor": page["next_cursor"],
+        }
+    )
+
+
+# Update many products with one statement
+@router.put(
+    "/bulk",
+    summary="Update products in bulk",
+    description="Updates every product matching the ids and/or filters with a single UPDATE. Returns the number of affected products.",
+    response_model=BulkResult,
+)
+async def update_products(
+    bulk_update: BulkUpdateProducts,
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> BulkResult:
+    return await product_service.update_products(bulk_update)
+
+
+# Delete many products with one statement
+@router.delete(
+    "/bulk",
+    summary="Delete products in bulk",
+    description="Deletes every product matching the ids and/or filters with a single DELETE. Returns the number of affected products.",
+    response_model=BulkResult,
+)
+async def delete_products(
+    product_filter: ProductFilter,
+    product_service: Annotated[ProductService, Depends(get_product_service)],
+) -> BulkResult:
+    return await product_service.delete_products(product_filter)
 
 
 # Get a product by ID
 @router.get(
     "/{product_id}",
     summary="Get a product by ID",
-    description="Retrieve the details of a product by its ID.",
+    description="Retrieve the details of a product by its ID. Send the returned ETag in If-None-Match to get 304 while it is unchanged.",
     response_model=ReadProduct,
 )
 async def get_product(
     product_id: UUID,
     product_service: Annotated[ProductService, Depends(get_product_service)],
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> dict[str, str | int]:
-    return product_service.get_product(product_id)
+    product = await product_service.get_product(product_id, if_none_match)
+    # a matching If-None-Match was already answered by the service
+    return json_response(product_rows.dump(product), row_etag(product.id, product.version))
 
 
 # Update a product
@@ -104,7 +346,7 @@ async def update_product(
     product_update: UpdateProduct,
     product_service: Annotated[ProductService, Depends(get_product_service)],
 ) -> dict[str, str | int]:
-    return product_service.update_product(product_id, product_update)
+    return await product_service.update_product(product_id, product_update)
 
 
 # Delete a product
@@ -117,4 +359,4 @@ async def delete_product(
     product_id: UUID,
     product_service: Annotated[ProductService, Depends(get_product_service)],
 ) -> None:
-    return product_service.delete_product(product_id)
+    return await product_service.delete_product(product_id)
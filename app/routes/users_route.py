@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, BackgroundTasks, Request, Form, Response
+from fastapi import APIRouter, Depends, Request, Form, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import HTMLResponse
 from typing import Annotated
@@ -22,7 +22,7 @@ router = APIRouter()
 async def register_user(
     user: UserIn, users_service: Annotated[UserService, Depends(get_users_service)]
 ):
-    return users_service.register_user(user)
+    return await users_service.register_user(user)
 
 
 @router.post("/login", response_model=Token, tags=["all"])
@@ -31,7 +31,7 @@ async def login_user(
     users_service: Annotated[UserService, Depends(get_users_service)],
     response: Response,
 ):
-    return users_service.login_user(form_data, response)
+    return await users_service.login_user(form_data, response)
 
 
 @router.get("/me", response_model=UserOut, tags=["all"])
@@ -46,16 +46,17 @@ async def change_password(
     current_user: Annotated[User, Depends(get_current_user)],
     users_service: Annotated[UserService, Depends(get_users_service)],
 ):
-    return users_service.change_password(current_password, new_password, current_user)
+    return await users_service.change_password(
+        current_password, new_password, current_user
+    )
 
 
 @router.post("/forgot-password", tags=["all"])
 async def forgot_password(
     email: EmailStr,
-    background_tasks: BackgroundTasks,
     users_service: Annotated[UserService, Depends(get_users_service)],
 ):
-    return users_service.forgot_password(email, background_tasks)
+    return await users_service.forgot_password(email)
 
 
 @router.get("/reset-password", response_class=HTMLResponse, tags=["Not to Use"])
@@ -69,7 +70,7 @@ async def reset_password(
     new_password: Annotated[str, Form(...)],
     users_service: Annotated[UserService, Depends(get_users_service)],
 ):
-    return users_service.reset_password(token, new_password)
+    return await users_service.reset_password(token, new_password)
 
 
 @router.post("/refresh-token", response_model=Token, tags=["all"])
@@ -77,7 +78,7 @@ async def refresh_token(
     refresh_token: str,
     users_service: Annotated[UserService, Depends(get_users_service)],
 ):
-    return users_service.refresh_token(refresh_token)
+    return await users_service.refresh_token(refresh_token)
 
 
 @router.post("/logout", tags=["all"])
@@ -88,4 +89,6 @@ async def logout(
     response: Response,
     access_token: str = Depends(oauth2_scheme),
 ):
-    return users_service.logout(current_user, request, response, access_token)
+    return await users_service.logout(
+        current_user, request, response, access_token
+    )
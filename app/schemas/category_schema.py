@@ -25,10 +25,14 @@ class UpdateCategory(BaseModel):
     parent_id: UUID | None = None
 
 
+class MoveCategory(BaseModel):
+    parent_id: UUID | None = None
+
+
 class NestedCategoryResponse(BaseModel):
     id: UUID
     name: str
-    patent_id: UUID | None
+    parent_id: UUID | None
     user_id: UUID
     subcategories: list["NestedCategoryResponse"] = []
 
@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+# Schemas shared by the product and category routes
+
+
+class CountResult(BaseModel):
+    count: int
+    approximate: bool = False
@@ -0,0 +1,52 @@
+from pydantic import BaseModel
+
+# Schemas for Monitoring
+
+
+class PoolStatus(BaseModel):
+    pool_class: str
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    timeout: float
+    checkouts: int
+    timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class CacheStats(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class PasswordPoolStats(BaseModel):
+    workers: int
+    max_queue: int
+    queued: int
+    running: int
+    max_queued: int
+    completed: int
+    rejected: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class EmailStats(BaseModel):
+    running: bool
+    pool_size: int
+    connections: int
+    queued: int
+    max_queue: int
+    in_flight: int
+    sent: int
+    failed: int
+    retried: int
+    rejected: int
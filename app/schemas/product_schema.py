@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from uuid import UUID
+from enum import Enum
 
 # Schemas for Product
 
@@ -28,3 +29,61 @@ class UpdateProduct(BaseModel):
     description: str | None = None
     price: float | None = Field(default=None, gt=0)
     category_id: UUID | None = None
+
+
+class ProductSortField(str, Enum):
+    id = "id"
+    name = "name"
+    price = "price"
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class ProductPage(BaseModel):
+    items: list[ReadProduct]
+    next_cursor: str | None = None
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkCreateResult(BaseModel):
+    created: int
+    errors: list[BulkItemError]
+
+
+class ProductFilter(BaseModel):
+    ids: list[UUID] | None = None
+    category_id: UUID | None = None
+    price_min: float | None = None
+    price_max: float | None = None
+
+
+class BulkUpdateProducts(ProductFilter):
+    values: UpdateProduct = UpdateProduct()
+    price_multiplier: float | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def validate_changes(self):
+        values = self.values.model_dump(exclude_unset=True)
+        if self.price_multiplier is not None and "price" in values:
+            raise ValueError("Use either values.price or price_multiplier, not both")
+        if self.price_multiplier is None and not values:
+            raise ValueError("Nothing to update")
+        return self
+
+
+class BulkResult(BaseModel):
+    affected: int
+
+
+class ImportResult(BaseModel):
+    import_id: UUID
+    imported: int
+    rejected: int
+    error_file: str | None = None
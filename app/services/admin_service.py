@@ -3,19 +3,20 @@ from typing import Annotated
 from sqlmodel import select
 from ..models.user_model import User
 from ..schemas.user_admin_schema import UserIn, Role
-from ..core.dependencies import SessionDep, pwd_context, admin_access
+from ..core.dependencies import SessionDep, admin_access
+from ..core.passwords import password_pool
 
 class AdminService:
     def __init__(self, session: SessionDep):
         self.session = session
 
-    def register_user(
+    async def register_user(
         self,
         user: UserIn,
         role: Role,
     ):
-        existing_user = self.session.exec(
-            select(User).where(User.email == user.email)
+        existing_user = (
+            await self.session.exec(select(User).where(User.email == user.email))
         ).first()
         if existing_user:
             raise HTTPException(
@@ -23,7 +24,7 @@ class AdminService:
                 detail="Email already registered",
             )
 
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = await password_pool.hash(user.password)
         user_in_db = User(
             email=user.email,
             full_name=user.full_name,
@@ -32,11 +33,11 @@ class AdminService:
         )
 
         self.session.add(user_in_db)
-        self.session.commit()
-        self.session.refresh(user_in_db)
+        await self.session.commit()
+        await self.session.refresh(user_in_db)
         return user_in_db
 
-    def get_all_users(
+    async def get_all_users(
         self,
         current_user: Annotated[User, Depends(admin_access)],
         limit: int = Query(default=10, ge=1),
@@ -50,5 +51,5 @@ class AdminService:
         else:
             query = select(User).where(User.role == role).offset(skip).limit(limit)
 
-        users = self.session.exec(query).all()
+        users = (await self.session.exec(query)).all()
         return users
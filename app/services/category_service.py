@@ -2,20 +2,37 @@ from fastapi import status, Response, Depends, HTTPException
 from sqlmodel import select
 from uuid import UUID
 from typing import Annotated
+from sqlalchemy import func, literal, update, text
 from sqlalchemy.exc import IntegrityError
 from ..models.category_model import Category
+from ..models.product_model import Product
 from ..models.user_model import User
 from ..schemas.category_schema import (
     CreateCategory,
+    ReadCategory,
     UpdateCategory,
     NestedCategoryResponse,
 )
 from ..models.user_model import User
 from ..core.dependencies import admin_access, SessionDep
+from ..core.config import settings
+from ..utils.export import stream_ndjson
+from ..utils.etag import row_etag, check_etag
+from ..core.list_cache import (
+    list_cache,
+    publish_list_change,
+    CATEGORY_LIST,
+    PRODUCT_LIST,
+    CachedList,
+    ListCache,
+)
+from ..utils.serialization import load_fields
+from ..utils.counting import estimated_count
 from ..core.exceptions import (
     ItemInvalidDataException,
     InternalServerException,
     ItemNotFoundException,
+    CategoryCycleException,
 )
 
 
@@ -26,30 +43,61 @@ class CategoryService:
         self.session = session
         self.current_user = current_user
 
-    def create_category(self, category: CreateCategory) -> dict[str, str | int | None]:
+    # a subtree is every path starting with the root's path; "0" sorts right after "/"
+    @staticmethod
+    def subtree_filter(path: str):
+        return Category.path >= path, Category.path < path[:-1] + "0"
+
+    # the share lock holds off a move of the parent until the caller commits,
+    # and waits for one in progress so the path read is the moved one
+    async def get_category_path(self, parent_id: UUID | None, user_id: UUID) -> str:
+        if parent_id is None:
+            return "/"
+        parent = (
+            await self.session.exec(
+                select(Category.path)
+                .where(Category.id == parent_id, Category.user_id == user_id)
+                .with_for_update(read=True)
+            )
+        ).first()
+        if parent is None:
+            raise ItemNotFoundException(type="Parent category", item_id=parent_id)
+        return parent
+
+    async def create_category(
+        self, category: CreateCategory
+    ) -> dict[str, str | int | None]:
         try:
             db_category = Category(
                 **category.model_dump(), user_id=self.current_user.id
             )
+            parent_path = await self.get_category_path(
+                category.parent_id, self.current_user.id
+            )
+            db_category.path = f"{parent_path}{db_category.id}/"
             self.session.add(db_category)
-            self.session.commit()
-            self.session.refresh(db_category)
+            await publish_list_change(self.session, CATEGORY_LIST, self.current_user.id)
+            await self.session.commit()
+            await self.session.refresh(db_category)
             return db_category
 
+        except ItemNotFoundException:
+            raise
+
         except IntegrityError as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise ItemInvalidDataException(e)
 
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise InternalServerException(e, __name__)
         
-    def create_category_for_user(self, user_id: UUID, category: CreateCategory):
+    async def create_category_for_user(self, user_id: UUID, category: CreateCategory):
         try:
             statement = select(User).where(
                 User.id == user_id, User.role == 'user'
             )
-            user = self.session.exec(statement).first()
+            user = (await self.session.exec(statement)).first()
 
             if not user:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='User not found')
@@ -57,31 +105,47 @@ class CategoryService:
             db_category = Category(
                 **category.model_dump(), user_id=user_id
             )
+            parent_path = await self.get_category_path(category.parent_id, user_id)
+            db_category.path = f"{parent_path}{db_category.id}/"
             self.session.add(db_category)
-            self.session.commit()
-            self.session.refresh(db_category)
+            await publish_list_change(self.session, CATEGORY_LIST, user_id)
+            await self.session.commit()
+            await self.session.refresh(db_category)
             return db_category
         
         except HTTPException:
             raise
 
         except IntegrityError as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise ItemInvalidDataException(e)
 
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise InternalServerException(e, __name__)
 
 
-    def get_categories(self) -> list[dict[str, str | int | None]]:
+    async def get_categories(
+        self, fields: tuple[str, ...] | None = None
+    ) -> CachedList:
+        # only the full list is cached, sparse fieldsets go to the database
+        if fields is None:
+            cached = list_cache.get(CATEGORY_LIST, self.current_user.id)
+            if cached is not None:
+                return cached
+        generation = list_cache.generation(CATEGORY_LIST, self.current_user.id)
         try:
-            categories = self.session.exec(
-                select(Category).where(Category.user_id == self.current_user.id)
-            ).all()
+            query = select(Category).where(Category.user_id == self.current_user.id)
+            if fields is not None:
+                query = query.options(load_fields(Category, fields))
+            categories = (await self.session.exec(query)).all()
             if not categories:
                 raise ItemNotFoundException(type="Category")
-            return categories
+            if fields is not None:
+                return ListCache.build(categories, ReadCategory, fields)
+            return list_cache.set(
+                CATEGORY_LIST, self.current_user.id, categories, ReadCategory, generation
+            )
 
         except ItemNotFoundException:
             raise
@@ -89,9 +153,14 @@ class CategoryService:
         except Exception as e:
             raise InternalServerException(e, __name__)
         
-    def get_all_categories(self) -> list[dict[str, str | int | None]]:
+    async def get_all_categories(
+        self, fields: tuple[str, ...] | None = None
+    ) -> list[dict[str, str | int | None]]:
         try:
-            categories = self.session.exec(select(Category)).all()
+            query = select(Category)
+            if fields is not None:
+                query = query.options(load_fields(Category, fields))
+            categories = (await self.session.exec(query)).all()
             if not categories:
                 raise ItemNotFoundException(type="Category")
             return categories
@@ -102,25 +171,39 @@ class CategoryService:
         except Exception as e:
             raise InternalServerException(e, __name__)
 
-    def get_pagination_categories(
+    def export_categories(self, all_users: bool = False):
+        query = select(Category)
+        if not all_users:
+            query = query.where(Category.user_id == self.current_user.id)
+        return stream_ndjson(query, ReadCategory)
+
+    async def get_pagination_categories(
         self,
         page: int = 1,
         size: int = 10,
         parent_id: UUID | None = None,
-    ) -> list[dict[str, str | int | None]]:
+        fields: tuple[str, ...] | None = None,
+        with_total: bool = False,
+    ) -> tuple[list[Category], int | None]:
         try:
-            query = select(Category).where(Category.user_id == self.current_user.id)
-
-            if parent_id is not None:
-                query = query.where(Category.parent_id == parent_id)
-
+            columns = [Category]
+            if with_total:
+                # counted over every filtered row before OFFSET/LIMIT, same query
+                columns.append(func.count().over().label("total"))
+            query = select(*columns).where(*self.pagination_conditions(parent_id))
+            if fields is not None:
+                query = query.options(load_fields(Category, fields))
+
+            # path order is stable and lists every parent before its children
             skip = (page - 1) * size
-            query = query.offset(skip).limit(size)
+            query = query.order_by(Category.path).offset(skip).limit(size)
 
-            categories = self.session.exec(query).all()
-            if not categories:
+            rows = (await self.session.exec(query)).all()
+            if not rows:
                 raise ItemNotFoundException(type="Category")
-            return categories
+            if with_total:
+                return [category for category, _ in rows], rows[0].total
+            return rows, None
 
         except ItemNotFoundException:
             raise
@@ -128,36 +211,100 @@ class CategoryService:
         except Exception as e:
             raise InternalServerException(e, __name__)
 
-    # dependency for nested category
-    def get_nested_categories(category: Category, user_id: UUID) -> dict:
-        if category.user_id != user_id:
-            return None
-
-        result = {
-            "id": category.id,
-            "name": category.name,
-            "parent_id": category.parent_id,
-            "subcategories": [
-                sub
-                for sub in (
-                    CategoryService.get_nested_categories(sub, user_id)
-                    for sub in category.subcategories
-                )
-                if sub
-            ],
-        }
-        return result
+    def pagination_conditions(self, parent_id: UUID | None = None) -> list:
+        conditions = [Category.user_id == self.current_user.id]
+        if parent_id is not None:
+            conditions.append(Category.parent_id == parent_id)
+        return conditions
 
-    def nested_category(self, category_id: UUID) -> NestedCategoryResponse:
+    # count(*) can use ix_category_user_id_path, or
+    # ix_category_parent_id_user_id when filtering by parent
+    async def count_categories(self, parent_id: UUID | None = None) -> dict:
         try:
-            statement = select(Category).where(
-                Category.id == category_id, Category.user_id == self.current_user.id
+            query = select(func.count()).select_from(Category).where(
+                *self.pagination_conditions(parent_id)
             )
-            category = self.session.exec(statement).first()
+            return {"count": (await self.session.exec(query)).one()}
 
-            if not category:
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+    async def count_all_categories(self, approximate: bool = False) -> dict:
+        try:
+            if approximate:
+                estimate = await estimated_count(self.session, "category")
+                if estimate is not None:
+                    return {"count": estimate, "approximate": True}
+            count = (
+                await self.session.exec(select(func.count()).select_from(Category))
+            ).one()
+            return {"count": count}
+
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+    # whole subtree in one WITH RECURSIVE query, bounded by category_max_depth
+    def subtree_query(self, category_id: UUID):
+        user_id = self.current_user.id
+        tree = (
+            select(
+                Category.id,
+                Category.name,
+                Category.parent_id,
+                Category.user_id,
+                literal(0).label("depth"),
+            )
+            .where(Category.id == category_id, Category.user_id == user_id)
+            .cte("tree", recursive=True)
+        )
+        tree = tree.union_all(
+            select(
+                Category.id,
+                Category.name,
+                Category.parent_id,
+                Category.user_id,
+                tree.c.depth + 1,
+            )
+            .join(tree, Category.parent_id == tree.c.id)
+            .where(
+                Category.user_id == user_id,
+                tree.c.depth < settings.category_max_depth,
+            )
+        )
+        return select(
+            tree.c.id, tree.c.name, tree.c.parent_id, tree.c.user_id
+        ).order_by(tree.c.depth)
+
+    # dependency for nested category
+    @staticmethod
+    def build_nested_categories(rows) -> dict | None:
+        nodes = {}
+        root = None
+        for row in rows:
+            # rows come ordered by depth, so parents are placed before their children
+            if row.id in nodes:
+                continue
+            node = {
+                "id": row.id,
+                "name": row.name,
+                "parent_id": row.parent_id,
+                "user_id": row.user_id,
+                "subcategories": [],
+            }
+            nodes[row.id] = node
+            if root is None:
+                root = node
+            else:
+                nodes[row.parent_id]["subcategories"].append(node)
+        return root
+
+    async def nested_category(self, category_id: UUID) -> NestedCategoryResponse:
+        try:
+            rows = (await self.session.exec(self.subtree_query(category_id))).all()
+
+            if not rows:
                 raise ItemNotFoundException(type="Category", item_id=category_id)
-            return CategoryService.get_nested_categories(category, self.current_user.id)
+            return CategoryService.build_nested_categories(rows)
 
         except ItemNotFoundException:
             raise
@@ -165,54 +312,182 @@ class CategoryService:
         except Exception as e:
             raise InternalServerException(e, __name__)
 
-    def read_category(self, category_id: UUID) -> dict[str, str | int | None]:
-        statement = select(Category).where(
-            Category.id == category_id, Category.user_id == self.current_user.id
+    async def read_category(
+        self, category_id: UUID, if_none_match: str | None = None
+    ) -> dict[str, str | int | None]:
+        conditions = (
+            Category.id == category_id,
+            Category.user_id == self.current_user.id,
         )
-        category = self.session.exec(statement).first()
+        statement = select(Category).where(*conditions)
+        category = (await self.session.exec(statement)).first()
 
         if not category:
             raise ItemNotFoundException(type="Category", item_id=category_id)
+        # one primary key lookup, a matching ETag just leaves the body out
+        check_etag(if_none_match, row_etag(category_id, category.version))
         return category
 
-    def update_category(
+    async def update_category(
         self, category_id: UUID, category_update: UpdateCategory
     ) -> dict[str, str | int | None]:
         try:
             statement = select(Category).where(
                 Category.id == category_id, Category.user_id == self.current_user.id
             )
-            category = self.session.exec(statement).first()
+            category = (await self.session.exec(statement)).first()
 
             if not category:
                 raise ItemNotFoundException(type="Category", item_id=category_id)
             category_data = category_update.model_dump(exclude_unset=True)
+            if "parent_id" in category_data:
+                parent_id = category_data.pop("parent_id")
+                if parent_id != category.parent_id:
+                    await self.move_subtree(category, parent_id)
             for key, value in category_data.items():
                 setattr(category, key, value)
             self.session.add(category)
-            self.session.commit()
-            self.session.refresh(category)
+            await publish_list_change(self.session, CATEGORY_LIST, self.current_user.id)
+            await self.session.commit()
+            await self.session.refresh(category)
             return category
 
-        except ItemNotFoundException:
+        except (ItemNotFoundException, CategoryCycleException):
+            raise
+
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise ItemInvalidDataException(e)
+
+        except Exception as e:
+            await self.session.rollback()
+            raise InternalServerException(e, __name__)
+
+    # rewrites the path prefix of the whole subtree with a single UPDATE
+    async def move_subtree(self, category: Category, parent_id: UUID | None):
+        # moves of one user's tree run one at a time, so the paths read
+        # below already reflect every move committed before this one
+        await self.session.exec(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))").bindparams(
+                key=f"category-tree:{self.current_user.id}"
+            )
+        )
+        old_path = (
+            await self.session.exec(
+                select(Category.path).where(Category.id == category.id)
+            )
+        ).one()
+        # waits for creates still holding a share lock inside the subtree;
+        # the UPDATE then runs on a snapshot that includes their rows
+        await self.session.exec(
+            select(Category.id)
+            .where(
+                Category.user_id == self.current_user.id,
+                *CategoryService.subtree_filter(old_path),
+            )
+            .with_for_update()
+        )
+        parent_path = await self.get_category_path(parent_id, self.current_user.id)
+        if parent_path.startswith(old_path):
+            raise CategoryCycleException()
+        new_path = f"{parent_path}{category.id}/"
+
+        await self.session.exec(
+            update(Category)
+            .where(
+                Category.user_id == self.current_user.id,
+                *CategoryService.subtree_filter(old_path),
+            )
+            .values(path=new_path + func.substr(Category.path, len(old_path) + 1))
+            .execution_options(synchronize_session=False)
+        )
+        category.parent_id = parent_id
+        category.path = new_path
+
+    async def move_category(
+        self, category_id: UUID, parent_id: UUID | None
+    ) -> dict[str, str | int | None]:
+        try:
+            category = await self.read_category(category_id)
+            if parent_id != category.parent_id:
+                await self.move_subtree(category, parent_id)
+                self.session.add(category)
+                await publish_list_change(
+                    self.session, CATEGORY_LIST, self.current_user.id
+                )
+                await self.session.commit()
+                await self.session.refresh(category)
+            return category
+
+        except (ItemNotFoundException, CategoryCycleException):
             raise
 
         except IntegrityError as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise ItemInvalidDataException(e)
 
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise InternalServerException(e, __name__)
 
-    def delete_category(self, category_id: UUID) -> None:
+    async def get_ancestors(
+        self, category_id: UUID
+    ) -> list[dict[str, str | int | None]]:
+        category = await self.read_category(category_id)
+        ancestor_ids = [UUID(part) for part in category.path.strip("/").split("/")[:-1]]
+        if not ancestor_ids:
+            return []
+        ancestors = (
+            await self.session.exec(
+                select(Category).where(
+                    Category.id.in_(ancestor_ids),
+                    Category.user_id == self.current_user.id,
+                )
+            )
+        ).all()
+        # root first, direct parent last
+        return sorted(ancestors, key=lambda ancestor: len(ancestor.path))
+
+    async def get_descendants(
+        self, category_id: UUID
+    ) -> list[dict[str, str | int | None]]:
+        category = await self.read_category(category_id)
+        descendants = (
+            await self.session.exec(
+                select(Category)
+                .where(
+                    Category.user_id == self.current_user.id,
+                    *CategoryService.subtree_filter(category.path),
+                    Category.id != category.id,
+                )
+                .order_by(Category.path)
+            )
+        ).all()
+        return descendants
+
+    async def delete_category(self, category_id: UUID) -> None:
         statement = select(Category).where(
             Category.id == category_id, Category.user_id == self.current_user.id
         )
-        category = self.session.exec(statement).first()
+        category = (await self.session.exec(statement)).first()
 
         if not category:
             raise ItemNotFoundException(type="Category", item_id=category_id)
-        self.session.delete(category)
-        self.session.commit()
+        # the cascade also removes the products filed under the subtree,
+        # whoever owns them
+        product_owners = (
+            await self.session.exec(
+                select(Product.user_id)
+                .distinct()
+                .join(Category, Product.category_id == Category.id)
+                .where(
+                    Category.user_id == self.current_user.id,
+                    *CategoryService.subtree_filter(category.path),
+                )
+            )
+        ).all()
+        await self.session.delete(category)
+        await publish_list_change(self.session, CATEGORY_LIST, self.current_user.id)
+        await publish_list_change(self.session, PRODUCT_LIST, *product_owners)
+        await self.session.commit()
         return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,16 +1,94 @@
-from fastapi import status, Response, Depends
-from uuid import UUID
+from fastapi import status, Response, Depends, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from uuid import UUID, uuid4
 from sqlmodel import select
 from typing import Annotated
+from sqlalchemy import tuple_, update, delete, text, func, or_, and_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+import base64
+import json
 from ..models.product_model import Product
+from ..models.category_model import Category
 from ..models.user_model import User
-from ..schemas.product_schema import CreateProduct, UpdateProduct
+from ..schemas.product_schema import (
+    CreateProduct,
+    ReadProduct,
+    UpdateProduct,
+    ProductSortField,
+    SortOrder,
+    ProductFilter,
+    BulkUpdateProducts,
+)
 from ..core.dependencies import get_current_user, SessionDep
+from ..core.config import settings
+from ..utils.export import stream_ndjson
+from ..utils.etag import row_etag, check_etag
+from ..core.list_cache import (
+    list_cache,
+    publish_list_change,
+    PRODUCT_LIST,
+    CachedList,
+    ListCache,
+)
+from ..utils.serialization import load_fields
+from ..utils.counting import estimated_count
+from ..utils.importer import read_records, validate_batch, ImportErrorFile
+from ..core.constants import (
+    item_not_found_exception,
+    duplicate_product_exception,
+    non_positive_price_exception,
+)
 from ..core.exceptions import (
     ItemInvalidDataException,
     InternalServerException,
     ItemNotFoundException,
+    InvalidCursorException,
+    EmptyFilterException,
+    UnsupportedImportFormatException,
+)
+
+IMPORT_COLUMNS = ["line", "id", "name", "description", "price", "category_id"]
+
+# asyncpg takes at most 32767 bind parameters per statement, and a multi-row
+# insert binds up to one per column and row
+BULK_INSERT_MAX_ROWS = 32767 // len(Product.__table__.columns)
+
+# the staging table lives for the transaction only
+CREATE_IMPORT_TABLE = text(
+    """
+    CREATE TEMP TABLE product_import (
+        line integer NOT NULL,
+        id uuid NOT NULL,
+        name text NOT NULL,
+        description text NOT NULL,
+        price double precision NOT NULL,
+        category_id uuid NOT NULL
+    ) ON COMMIT DROP
+    """
+)
+
+# inserts every staged row whose category exists and belongs to the user and
+# returns the ones that did not make it, either for the category or for a
+# duplicate name
+MERGE_IMPORT_TABLE = text(
+    """
+    WITH inserted AS (
+        INSERT INTO product (id, name, description, price, user_id, category_id)
+        SELECT s.id, s.name, s.description, s.price, :user_id, s.category_id
+        FROM product_import s
+        JOIN category c ON c.id = s.category_id AND c.user_id = :user_id
+        ORDER BY s.line
+        ON CONFLICT DO NOTHING
+        RETURNING id
+    )
+    SELECT s.line, s.category_id, c.id IS NULL AS missing_category
+    FROM product_import s
+    LEFT JOIN category c ON c.id = s.category_id AND c.user_id = :user_id
+    WHERE NOT EXISTS (SELECT 1 FROM inserted i WHERE i.id = s.id)
+    ORDER BY s.line
+    """
 )
 
 
@@ -23,30 +101,208 @@ class ProductService:
         self.session = session
         self.current_user = current_user
 
-    def create_product(self, product: CreateProduct) -> dict[str, str | int]:
+    async def create_product(self, product: CreateProduct) -> dict[str, str | int]:
         try:
             db_product = Product(**product.model_dump(), user_id=self.current_user.id)
             self.session.add(db_product)
-            self.session.commit()
-            self.session.refresh(db_product)
+            await publish_list_change(self.session, PRODUCT_LIST, self.current_user.id)
+            await self.session.commit()
+            await self.session.refresh(db_product)
             return db_product
 
         except IntegrityError as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise ItemInvalidDataException(e)
 
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise InternalServerException(e, __name__)
 
-    def get_products(self) -> list[dict[str, str | int]]:
+    @staticmethod
+    def validation_error_detail(error: ValidationError) -> str:
+        details = []
+        for item in error.errors():
+            if item["loc"] == ("price",) and item["type"] == "greater_than":
+                details.append(non_positive_price_exception)
+            else:
+                field = ".".join(str(part) for part in item["loc"])
+                details.append(f"{field}: {item['msg']}")
+        return "; ".join(details)
+
+    async def create_products(self, items: list[dict]) -> dict:
+        errors = []
+        rows = []
+        for index, item in enumerate(items):
+            try:
+                product = CreateProduct.model_validate(item)
+            except ValidationError as e:
+                detail = ProductService.validation_error_detail(e)
+                errors.append({"index": index, "detail": detail})
+                continue
+            row = product.model_dump()
+            row.update(id=uuid4(), user_id=self.current_user.id)
+            rows.append((index, row))
+
         try:
-            products = self.session.exec(
-                select(Product).where(Product.user_id == self.current_user.id)
-            ).all()
+            # an unknown category would abort the whole statement on the foreign key
+            category_ids = {row["category_id"] for _, row in rows}
+            existing = set()
+            if category_ids:
+                existing = set(
+                    (
+                        await self.session.exec(
+                            select(Category.id).where(Category.id.in_(category_ids))
+                        )
+                    ).all()
+                )
+            valid_rows = []
+            for index, row in rows:
+                if row["category_id"] in existing:
+                    valid_rows.append((index, row))
+                else:
+                    detail = item_not_found_exception("Category", row["category_id"])
+                    errors.append({"index": index, "detail": detail})
+
+            created = 0
+            batch_size = min(settings.bulk_insert_batch_size, BULK_INSERT_MAX_ROWS)
+            for start in range(0, len(valid_rows), batch_size):
+                batch = valid_rows[start : start + batch_size]
+                statement = (
+                    insert(Product)
+                    .values([row for _, row in batch])
+                    .on_conflict_do_nothing(constraint="uq_product_name_category")
+                    .returning(Product.id)
+                )
+                inserted = set((await self.session.exec(statement)).scalars().all())
+                created += len(inserted)
+                for index, row in batch:
+                    if row["id"] not in inserted:
+                        detail = duplicate_product_exception
+                        errors.append({"index": index, "detail": detail})
+            if created:
+                await publish_list_change(
+                    self.session, PRODUCT_LIST, self.current_user.id
+                )
+            await self.session.commit()
+
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise ItemInvalidDataException(e)
+
+        except Exception as e:
+            await self.session.rollback()
+            raise InternalServerException(e, __name__)
+
+        errors.sort(key=lambda error: error["index"])
+        return {"created": created, "errors": errors}
+
+    def import_error_path(self, import_id: UUID):
+        user_dir = settings.import_error_dir / str(self.current_user.id)
+        return user_dir / f"{import_id}.csv"
+
+    async def import_products(self, file: UploadFile) -> dict:
+        records = read_records(file.file, file.filename)
+        if records is None:
+            raise UnsupportedImportFormatException()
+
+        import_id = uuid4()
+        error_file = ImportErrorFile(self.import_error_path(import_id))
+        imported = 0
+        try:
+            await self.session.exec(CREATE_IMPORT_TABLE)
+            connection = await (await self.session.connection()).get_raw_connection()
+            driver = connection.driver_connection
+
+            # valid rows go to the staging table with COPY, one batch at a time
+            while True:
+                valid, errors, read = await run_in_threadpool(
+                    validate_batch,
+                    records,
+                    CreateProduct,
+                    settings.import_batch_size,
+                    ProductService.validation_error_detail,
+                )
+                if not read:
+                    break
+                for line, detail in errors:
+                    error_file.write(line, detail)
+                if valid:
+                    await driver.copy_records_to_table(
+                        "product_import",
+                        columns=IMPORT_COLUMNS,
+                        records=[
+                            (
+                                line,
+                                uuid4(),
+                                product.name,
+                                product.description,
+                                product.price,
+                                product.category_id,
+                            )
+                            for line, product in valid
+                        ],
+                    )
+                    imported += len(valid)
+
+            result = await self.session.stream(
+                MERGE_IMPORT_TABLE.bindparams(user_id=self.current_user.id)
+            )
+            async for line, category_id, missing_category in result:
+                if missing_category:
+                    detail = item_not_found_exception("Category", category_id)
+                else:
+                    detail = duplicate_product_exception
+                error_file.write(line, detail)
+                imported -= 1
+            if imported:
+                await publish_list_change(
+                    self.session, PRODUCT_LIST, self.current_user.id
+                )
+            await self.session.commit()
+
+        except Exception as e:
+            await self.session.rollback()
+            error_file.close()
+            error_file.path.unlink(missing_ok=True)
+            raise InternalServerException(e, __name__)
+
+        error_file.close()
+        return {
+            "import_id": import_id,
+            "imported": imported,
+            "rejected": error_file.count,
+            "error_file": (
+                f"/product/import/{import_id}/errors" if error_file.count else None
+            ),
+        }
+
+    def get_import_errors(self, import_id: UUID):
+        path = self.import_error_path(import_id)
+        if not path.is_file():
+            raise ItemNotFoundException(type="Import error file", item_id=import_id)
+        return path
+
+    async def get_products(
+        self, fields: tuple[str, ...] | None = None
+    ) -> CachedList:
+        # only the full list is cached, sparse fieldsets go to the database
+        if fields is None:
+            cached = list_cache.get(PRODUCT_LIST, self.current_user.id)
+            if cached is not None:
+                return cached
+        generation = list_cache.generation(PRODUCT_LIST, self.current_user.id)
+        try:
+            query = select(Product).where(Product.user_id == self.current_user.id)
+            if fields is not None:
+                query = query.options(load_fields(Product, fields))
+            products = (await self.session.exec(query)).all()
             if not products:
                 raise ItemNotFoundException(type="Product")
-            return products
+            if fields is not None:
+                return ListCache.build(products, ReadProduct, fields)
+            return list_cache.set(
+                PRODUCT_LIST, self.current_user.id, products, ReadProduct, generation
+            )
 
         except ItemNotFoundException:
             raise
@@ -54,9 +310,12 @@ class ProductService:
         except Exception as e:
             raise InternalServerException(e, __name__)
         
-    def get_all_products(self):
+    async def get_all_products(self, fields: tuple[str, ...] | None = None):
         try:
-            products = self.session.exec(select(Product)).all()
+            query = select(Product)
+            if fields is not None:
+                query = query.options(load_fields(Product, fields))
+            products = (await self.session.exec(query)).all()
             if not products:
                 raise ItemNotFoundException(type="Product")
             return products
@@ -67,31 +326,42 @@ class ProductService:
         except Exception as e:
             raise InternalServerException(e, __name__)
 
-    def get_pagination_products(
+    def export_products(self, all_users: bool = False):
+        query = select(Product)
+        if not all_users:
+            query = query.where(Product.user_id == self.current_user.id)
+        return stream_ndjson(query, ReadProduct)
+
+    async def get_pagination_products(
         self,
         page: int = 1,
         size: int = 10,
         category_id: UUID | None = None,
         price_min: float | None = None,
         price_max: float | None = None,
-    ) -> list[dict[str, str | int]]:
+        fields: tuple[str, ...] | None = None,
+        with_total: bool = False,
+    ) -> tuple[list[Product], int | None]:
         try:
-            query = select(Product).where(Product.user_id == self.current_user.id)
-
-            if price_min is not None:
-                query = query.where(Product.price >= price_min)
-            if price_max is not None:
-                query = query.where(Product.price <= price_max)
-            if category_id is not None:
-                query = query.where(Product.category_id == category_id)
+            columns = [Product]
+            if with_total:
+                # counted over every filtered row before OFFSET/LIMIT, same query
+                columns.append(func.count().over().label("total"))
+            query = select(*columns).where(
+                *self.pagination_conditions(category_id, price_min, price_max)
+            )
+            if fields is not None:
+                query = query.options(load_fields(Product, fields))
 
             skip = (page - 1) * size
-            query = query.offset(skip).limit(size)
+            query = query.order_by(Product.id).offset(skip).limit(size)
 
-            products = self.session.exec(query).all()
-            if not products:
+            rows = (await self.session.exec(query)).all()
+            if not rows:
                 raise ItemNotFoundException(type="Product")
-            return products
+            if with_total:
+                return [product for product, _ in rows], rows[0].total
+            return rows, None
 
         except ItemNotFoundException:
             raise
@@ -99,24 +369,195 @@ class ProductService:
         except Exception as e:
             raise InternalServerException(e, __name__)
 
-    def get_product(self, product_id: UUID) -> dict[str, str | int]:
-        statement = select(Product).where(
-            Product.id == product_id, Product.user_id == self.current_user.id
+    def pagination_conditions(
+        self,
+        category_id: UUID | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+    ) -> list:
+        conditions = [Product.user_id == self.current_user.id]
+        if price_min is not None:
+            conditions.append(Product.price >= price_min)
+        if price_max is not None:
+            conditions.append(Product.price <= price_max)
+        if category_id is not None:
+            conditions.append(Product.category_id == category_id)
+        return conditions
+
+    # count(*) with the pagination filters; every filter combination is
+    # covered by an index that starts with user_id or category_id, so
+    # postgres can use an index-only scan on (user_id) when the visibility
+    # map is current, and an index scan with heap checks when it is not
+    async def count_products(
+        self,
+        category_id: UUID | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+    ) -> dict:
+        try:
+            query = select(func.count()).select_from(Product).where(
+                *self.pagination_conditions(category_id, price_min, price_max)
+            )
+            return {"count": (await self.session.exec(query)).one()}
+
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+    async def count_all_products(self, approximate: bool = False) -> dict:
+        try:
+            if approximate:
+                estimate = await estimated_count(self.session, "product")
+                if estimate is not None:
+                    return {"count": estimate, "approximate": True}
+            count = (
+                await self.session.exec(select(func.count()).select_from(Product))
+            ).one()
+            return {"count": count}
+
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+    # cursor is the (sort value, id) of the last row, bound to the sort it came from
+    @staticmethod
+    def encode_cursor(sort_by: ProductSortField, order: SortOrder, product) -> str:
+        value = getattr(product, sort_by.value)
+        data = [sort_by.value, order.value, str(value), str(product.id)]
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str, sort_by: ProductSortField, order: SortOrder):
+        try:
+            cursor_sort, cursor_order, value, last_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            if cursor_sort != sort_by.value or cursor_order != order.value:
+                raise ValueError("cursor does not match the requested sort")
+            if sort_by == ProductSortField.price:
+                value = float(value)
+            elif sort_by == ProductSortField.id:
+                value = UUID(value)
+            return value, UUID(last_id)
+        except Exception:
+            raise InvalidCursorException()
+
+    async def get_cursor_products(
+        self,
+        size: int = 10,
+        cursor: str | None = None,
+        sort_by: ProductSortField = ProductSortField.id,
+        order: SortOrder = SortOrder.asc,
+        category_id: UUID | None = None,
+        price_min: float | None = None,
+        price_max: float | None = None,
+    ) -> dict:
+        sort_column = getattr(Product, sort_by.value)
+        query = select(Product).where(Product.user_id == self.current_user.id)
+
+        if price_min is not None:
+            query = query.where(Product.price >= price_min)
+        if price_max is not None:
+            query = query.where(Product.price <= price_max)
+        if category_id is not None:
+            query = query.where(Product.category_id == category_id)
+
+        if cursor is not None:
+            value, last_id = ProductService.decode_cursor(cursor, sort_by, order)
+            if sort_by == ProductSortField.id:
+                position, last = Product.id, last_id
+            else:
+                position, last = tuple_(sort_column, Product.id), tuple_(value, last_id)
+            query = query.where(
+                position > last if order == SortOrder.asc else position < last
+            )
+
+        if order == SortOrder.asc:
+            query = query.order_by(sort_column.asc(), Product.id.asc())
+        else:
+            query = query.order_by(sort_column.desc(), Product.id.desc())
+
+        try:
+            # one extra row tells whether another page exists
+            products = (await self.session.exec(query.limit(size + 1))).all()
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+        next_cursor = None
+        if len(products) > size:
+            products = products[:size]
+            next_cursor = ProductService.encode_cursor(sort_by, order, products[-1])
+        return {"items": products, "next_cursor": next_cursor}
+
+    # search cursor is the (rank, id) of the last row, bound to the query text
+    @staticmethod
+    def encode_search_cursor(q: str, rank: float, product) -> str:
+        data = [q, rank, str(product.id)]
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    @staticmethod
+    def decode_search_cursor(cursor: str, q: str):
+        try:
+            cursor_q, rank, last_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            if cursor_q != q:
+                raise ValueError("cursor does not match the search")
+            return float(rank), UUID(last_id)
+        except Exception:
+            raise InvalidCursorException()
+
+    async def search_products(
+        self, q: str, size: int = 10, cursor: str | None = None
+    ) -> dict:
+        ts_query = func.websearch_to_tsquery("english", q)
+        rank = func.ts_rank_cd(Product.search_vector, ts_query)
+        query = select(Product, rank).where(
+            Product.user_id == self.current_user.id,
+            Product.search_vector.op("@@")(ts_query),
         )
-        product = self.session.exec(statement).first()
+
+        if cursor is not None:
+            last_rank, last_id = ProductService.decode_search_cursor(cursor, q)
+            query = query.where(
+                or_(rank < last_rank, and_(rank == last_rank, Product.id > last_id))
+            )
+
+        query = query.order_by(rank.desc(), Product.id.asc())
+
+        try:
+            rows = (await self.session.exec(query.limit(size + 1))).all()
+        except Exception as e:
+            raise InternalServerException(e, __name__)
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last_product, last_rank = rows[-1]
+            next_cursor = ProductService.encode_search_cursor(
+                q, last_rank, last_product
+            )
+        return {"items": [product for product, _ in rows], "next_cursor": next_cursor}
+
+    async def get_product(
+        self, product_id: UUID, if_none_match: str | None = None
+    ) -> dict[str, str | int]:
+        conditions = (Product.id == product_id, Product.user_id == self.current_user.id)
+        statement = select(Product).where(*conditions)
+        product = (await self.session.exec(statement)).first()
 
         if not product:
             raise ItemNotFoundException(type="Product", item_id=product_id)
+        # one primary key lookup, a matching ETag just leaves the body out
+        check_etag(if_none_match, row_etag(product_id, product.version))
         return product
 
-    def update_product(
+    async def update_product(
         self, product_id: UUID, product_update: UpdateProduct
     ) -> dict[str, str | int]:
         try:
             statement = select(Product).where(
                 Product.id == product_id, Product.user_id == self.current_user.id
             )
-            product = self.session.exec(statement).first()
+            product = (await self.session.exec(statement)).first()
 
             if not product:
                 raise ItemNotFoundException(type="Product", item_id=product_id)
@@ -124,29 +565,92 @@ class ProductService:
             for key, value in product_data.items():
                 setattr(product, key, value)
             self.session.add(product)
-            self.session.commit()
-            self.session.refresh(product)
+            await publish_list_change(self.session, PRODUCT_LIST, self.current_user.id)
+            await self.session.commit()
+            await self.session.refresh(product)
             return product
 
         except ItemNotFoundException:
             raise
 
         except IntegrityError as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise ItemInvalidDataException(e)
 
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise InternalServerException(e, __name__)
 
-    def delete_product(self, product_id: UUID) -> None:
+    async def delete_product(self, product_id: UUID) -> None:
         statement = select(Product).where(
             Product.id == product_id, Product.user_id == self.current_user.id
         )
-        product = self.session.exec(statement).first()
+        product = (await self.session.exec(statement)).first()
 
         if not product:
             raise ItemNotFoundException(type="Product", item_id=product_id)
-        self.session.delete(product)
-        self.session.commit()
+        await self.session.delete(product)
+        await publish_list_change(self.session, PRODUCT_LIST, self.current_user.id)
+        await self.session.commit()
         return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+    # always scoped to the current user, refusing to touch every product at once
+    def filter_conditions(self, product_filter: ProductFilter) -> list:
+        conditions = []
+        if product_filter.ids is not None:
+            conditions.append(Product.id.in_(product_filter.ids))
+        if product_filter.category_id is not None:
+            conditions.append(Product.category_id == product_filter.category_id)
+        if product_filter.price_min is not None:
+            conditions.append(Product.price >= product_filter.price_min)
+        if product_filter.price_max is not None:
+            conditions.append(Product.price <= product_filter.price_max)
+        if not conditions:
+            raise EmptyFilterException()
+        return [Product.user_id == self.current_user.id, *conditions]
+
+    async def update_products(self, bulk_update: BulkUpdateProducts) -> dict:
+        conditions = self.filter_conditions(bulk_update)
+        values = bulk_update.values.model_dump(exclude_unset=True)
+        if bulk_update.price_multiplier is not None:
+            values["price"] = Product.price * bulk_update.price_multiplier
+        try:
+            result = await self.session.exec(
+                update(Product)
+                .where(*conditions)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                await publish_list_change(
+                    self.session, PRODUCT_LIST, self.current_user.id
+                )
+            await self.session.commit()
+            return {"affected": result.rowcount}
+
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise ItemInvalidDataException(e)
+
+        except Exception as e:
+            await self.session.rollback()
+            raise InternalServerException(e, __name__)
+
+    async def delete_products(self, product_filter: ProductFilter) -> dict:
+        conditions = self.filter_conditions(product_filter)
+        try:
+            result = await self.session.exec(
+                delete(Product)
+                .where(*conditions)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                await publish_list_change(
+                    self.session, PRODUCT_LIST, self.current_user.id
+                )
+            await self.session.commit()
+            return {"affected": result.rowcount}
+
+        except Exception as e:
+            await self.session.rollback()
+            raise InternalServerException(e, __name__)
@@ -2,7 +2,6 @@ from fastapi import (
     Depends,
     HTTPException,
     status,
-    BackgroundTasks,
     Request,
     Form,
     Response,
@@ -13,23 +12,26 @@ from jwt.exceptions import InvalidTokenError
 from typing import Annotated
 from sqlmodel import select
 from pydantic import EmailStr
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 from ..models.user_model import User
 from ..models.blacklistedtoken_model import BlacklistedToken
 from ..schemas.user_admin_schema import UserIn
-from ..core.dependencies import SessionDep, pwd_context, get_current_user, oauth2_scheme
-from ..core.auth import create_access_token, create_refresh_token, clean_old_tokens
+from ..core.dependencies import SessionDep, get_current_user, oauth2_scheme
+from ..core.passwords import password_pool
+from ..core.auth import create_access_token, create_refresh_token
 from ..utils.send_email import send_reset_email
 from ..core.config import settings
+from ..core.revocation import revocation_cache, publish_revocation
+from ..core.principals import publish_user_change
 # from ..core.exceptions import logger
 
 class UserService:
     def __init__(self, session: SessionDep):
         self.session = session
 
-    def register_user(self, user: UserIn):
-        existing_user = self.session.exec(
-            select(User).where(User.email == user.email)
+    async def register_user(self, user: UserIn):
+        existing_user = (
+            await self.session.exec(select(User).where(User.email == user.email))
         ).first()
         if existing_user:
             raise HTTPException(
@@ -37,7 +39,7 @@ class UserService:
                 detail="Email already registered",
             )
 
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = await password_pool.hash(user.password)
         user_in_db = User(
             email=user.email,
             full_name=user.full_name,
@@ -46,23 +48,25 @@ class UserService:
         )
 
         self.session.add(user_in_db)
-        self.session.commit()
-        self.session.refresh(user_in_db)
+        await self.session.commit()
+        await self.session.refresh(user_in_db)
         return user_in_db
 
-    def login_user(
+    async def login_user(
         self,
         form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
         response: Response,
     ):
-        user = self.session.exec(
-            select(User).where(User.email == form_data.username)
+        user = (
+            await self.session.exec(
+                select(User).where(User.email == form_data.username)
+            )
         ).first()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email/user!"
             )
-        if not pwd_context.verify(form_data.password, user.hashed_password):
+        if not await password_pool.verify(form_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password!"
             )
@@ -79,25 +83,30 @@ class UserService:
             "token_type": "bearer",
         }
 
-    def change_password(
+    async def change_password(
         self,
         current_password: str,
         new_password: str,
         current_user: Annotated[User, Depends(get_current_user)],
     ):
-        if not pwd_context.verify(current_password, current_user.hashed_password):
+        if not await password_pool.verify(
+            current_password, current_user.hashed_password
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect current password!",
             )
         UserIn.validate_password(new_password)
-        current_user.hashed_password = pwd_context.hash(new_password)
+        current_user.hashed_password = await password_pool.hash(new_password)
         self.session.add(current_user)
-        self.session.commit()
+        await publish_user_change(self.session, current_user.id)
+        await self.session.commit()
         return {"message": "Password updated successfully"}
 
-    def forgot_password(self, email: EmailStr, background_tasks: BackgroundTasks):
-        user = self.session.exec(select(User).where(User.email == email)).first()
+    async def forgot_password(self, email: EmailStr):
+        user = (
+            await self.session.exec(select(User).where(User.email == email))
+        ).first()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -107,7 +116,8 @@ class UserService:
             expires_delta=timedelta(minutes=settings.email_expire_minutes),
         )
 
-        background_tasks.add_task(send_reset_email, email, reset_token)
+        # only queued here, the dispatcher sends it in the background
+        await send_reset_email(email, reset_token)
 
         return {"message": "Password reset email sent."}
 
@@ -203,7 +213,7 @@ class UserService:
         </html>
         """
 
-    def reset_password(
+    async def reset_password(
         self, token: Annotated[str, Form(...)], new_password: Annotated[str, Form(...)]
     ):
         try:
@@ -219,22 +229,25 @@ class UserService:
 
             UserIn.validate_password(new_password)
 
-            user = self.session.exec(select(User).where(User.id == uuid)).first()
+            user = (
+                await self.session.exec(select(User).where(User.id == uuid))
+            ).first()
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
                 )
 
-            user.hashed_password = pwd_context.hash(new_password)
+            user.hashed_password = await password_pool.hash(new_password)
             self.session.add(user)
-            self.session.commit()
+            await publish_user_change(self.session, user.id)
+            await self.session.commit()
 
             return {"message": "Password has been reset successfully"}
 
         except InvalidTokenError:
             raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    def refresh_token(self, refresh_token: str):
+    async def refresh_token(self, refresh_token: str):
         try:
             data = jwt.decode(
                 refresh_token, settings.secret_key, algorithms=[settings.algorithm]
@@ -245,9 +258,11 @@ class UserService:
                     detail="Invalid token type: refresh token required",
                 )
 
-            blacklisted = self.session.exec(
-                select(BlacklistedToken).where(
-                    BlacklistedToken.refresh_token == data.get("jti")
+            blacklisted = (
+                await self.session.exec(
+                    select(BlacklistedToken).where(
+                        BlacklistedToken.refresh_token == data.get("jti")
+                    )
                 )
             ).first()
             if blacklisted:
@@ -262,7 +277,9 @@ class UserService:
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid refresh token",
                 )
-            user = self.session.exec(select(User).where(User.id == uuid)).first()
+            user = (
+                await self.session.exec(select(User).where(User.id == uuid))
+            ).first()
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
@@ -282,7 +299,7 @@ class UserService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail=str(error)
             )
 
-    def logout(
+    async def logout(
         self,
         current_user: Annotated[User, Depends(get_current_user)],
         request: Request,
@@ -313,11 +330,20 @@ class UserService:
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
 
+        access_expires_at = datetime.fromtimestamp(data_access["exp"], timezone.utc)
+        refresh_expires_at = datetime.fromtimestamp(data_refresh["exp"], timezone.utc)
+        # the row has to outlive both tokens, otherwise the purge would
+        # make a logged out refresh token usable again
         blacklisted = BlacklistedToken(
-            access_token=data_access.get("jti"), refresh_token=data_refresh.get("jti")
+            access_token=data_access.get("jti"),
+            refresh_token=data_refresh.get("jti"),
+            expires_at=max(access_expires_at, refresh_expires_at),
         )
         self.session.add(blacklisted)
-        self.session.commit()
+        await publish_revocation(
+            self.session, data_access.get("jti"), access_expires_at
+        )
+        await self.session.commit()
+        revocation_cache.add(data_access.get("jti"), access_expires_at)
         response.delete_cookie("refresh_token")
-        clean_old_tokens(self.session)
         return {"message": f"{current_user.email} is logged out successfully"}
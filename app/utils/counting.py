@@ -0,0 +1,16 @@
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# the planner's row estimate from the last ANALYZE or autovacuum, read from
+# the catalog without touching the table
+ESTIMATED_ROWS = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+)
+
+
+# None while the table has never been analyzed
+async def estimated_count(session: AsyncSession, table: str) -> int | None:
+    estimate = (
+        await session.exec(ESTIMATED_ROWS.bindparams(table=table))
+    ).scalar_one()
+    return estimate if estimate >= 0 else None
@@ -0,0 +1,164 @@
+import asyncio
+from email.message import EmailMessage
+from aiosmtplib import (
+    SMTP,
+    SMTPException,
+    SMTPResponseException,
+    SMTPRecipientsRefused,
+)
+from ..core.config import settings
+from ..core.exceptions import EmailQueueFullException
+from ..core.logers import logger
+
+
+# every worker owns one authenticated SMTP connection and keeps it open
+# between messages, so the pool size is also the concurrency limit
+class EmailDispatcher:
+    def __init__(self):
+        self.queue: asyncio.Queue | None = None
+        self.workers = []
+        self.connections = 0
+        self.in_flight = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=settings.email_queue_size)
+        self.workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(settings.email_pool_size)
+        ]
+
+    async def stop(self):
+        if not self.running:
+            return
+        # give queued mail a chance to go out before the workers go away
+        try:
+            await asyncio.wait_for(self.queue.join(), settings.email_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.queue.qsize()} queued emails on shutdown")
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+
+    async def submit(self, message: EmailMessage):
+        if not self.running:
+            # no lifespan (scripts, bare test clients): deliver right away
+            await self._close(await self._deliver(message, None))
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise EmailQueueFullException()
+
+    async def _connect(self) -> SMTP:
+        smtp = SMTP(
+            hostname=settings.email_host,
+            port=settings.email_port,
+            start_tls=settings.email_start_tls,
+            timeout=settings.email_timeout,
+        )
+        await smtp.connect()
+        if settings.email_username and settings.email_password:
+            try:
+                await smtp.login(settings.email_username, settings.email_password)
+            except Exception:
+                smtp.close()
+                raise
+        self.connections += 1
+        return smtp
+
+    async def _close(self, smtp: SMTP | None):
+        if smtp is None:
+            return
+        self.connections -= 1
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    # the server may have dropped a connection while it sat idle
+    async def _check(self, smtp: SMTP | None) -> SMTP | None:
+        if smtp is None or not smtp.is_connected:
+            return smtp
+        try:
+            await smtp.noop()
+            return smtp
+        except (SMTPException, OSError, asyncio.TimeoutError):
+            await self._close(smtp)
+            return None
+
+    async def _worker(self):
+        smtp = None
+        try:
+            while True:
+                message = await self.queue.get()
+                try:
+                    smtp = await self._deliver(message, smtp)
+                finally:
+                    self.queue.task_done()
+        finally:
+            await self._close(smtp)
+
+    # sends on the given connection, reconnecting and backing off on
+    # transient failures; returns the connection to reuse for the next one
+    async def _deliver(self, message: EmailMessage, smtp: SMTP | None):
+        self.in_flight += 1
+        try:
+            smtp = await self._check(smtp)
+            for attempt in range(settings.email_max_retries + 1):
+                try:
+                    if smtp is None or not smtp.is_connected:
+                        await self._close(smtp)
+                        smtp = None
+                        smtp = await self._connect()
+                    await smtp.send_message(message)
+                    self.sent += 1
+                    return smtp
+                except (SMTPException, OSError, asyncio.TimeoutError) as error:
+                    permanent = isinstance(error, SMTPRecipientsRefused) or (
+                        isinstance(error, SMTPResponseException) and error.code >= 500
+                    )
+                    if permanent or attempt == settings.email_max_retries:
+                        self.failed += 1
+                        logger.warning(f"Email to {message['To']} failed: {error}")
+                        return smtp
+                    self.retried += 1
+                    await self._close(smtp)
+                    smtp = None
+                    await asyncio.sleep(settings.email_retry_backoff * 2**attempt)
+                except Exception as error:
+                    # a malformed message must not take the worker down
+                    self.failed += 1
+                    logger.warning(f"Email to {message['To']} failed: {error}")
+                    return smtp
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pool_size": settings.email_pool_size,
+            "connections": self.connections,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue": settings.email_queue_size,
+            "in_flight": self.in_flight,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rejected": self.rejected,
+        }
+
+
+email_dispatcher = EmailDispatcher()
@@ -0,0 +1,33 @@
+import hashlib
+from ..core.exceptions import NotModifiedException
+
+
+# strong validator of a single row, the version changes on every write
+def row_etag(row_id, version: int) -> str:
+    return f'"{row_id}-{version}"'
+
+
+# changes when any listed row is written, added or removed; extra covers
+# anything else in the body, like a next cursor
+def list_etag(rows, *extra) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(f"{row.id}-{row.version};".encode())
+    for part in extra:
+        digest.update(f"{part};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+# If-None-Match uses the weak comparison, so a W/ prefix still matches
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in tags
+
+
+def check_etag(if_none_match: str | None, etag: str):
+    if etag_matches(if_none_match, etag):
+        raise NotModifiedException(etag)
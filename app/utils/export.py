@@ -0,0 +1,20 @@
+import orjson
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database import engine
+from ..core.config import settings
+from .serialization import row_serializer, dumps
+
+
+# the request session is closed before a StreamingResponse starts sending,
+# so the export opens its own and reads through a server-side cursor
+async def stream_ndjson(query, schema):
+    serializer = row_serializer(schema)
+    async with AsyncSession(engine) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=settings.export_batch_size)
+        )
+        async for rows in result.scalars().partitions():
+            yield b"".join(
+                dumps(item, orjson.OPT_APPEND_NEWLINE)
+                for item in serializer.dump_many(rows)
+            )
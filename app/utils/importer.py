@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+import time
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+from pydantic import BaseModel, ValidationError
+
+NOT_UTF8 = "Row is not valid UTF-8"
+
+
+# upload lines decoded as UTF-8; undecodable bytes are kept as surrogates so
+# the rest of the file still reads, and the line is flagged instead
+class DecodedLines:
+    def __init__(self, file, newline: str | None = None):
+        self.lines = io.TextIOWrapper(
+            file, encoding="utf-8-sig", errors="surrogateescape", newline=newline
+        )
+        self.undecodable = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = next(self.lines)
+        try:
+            line.encode("utf-8")
+        except UnicodeEncodeError:
+            self.undecodable = True
+        return line
+
+
+# yields (line, data) per record without reading the whole upload into memory;
+# data is the reason instead when the line could not be parsed at all
+def read_csv(file):
+    lines = DecodedLines(file, newline="")
+    reader = csv.DictReader(lines)
+    while True:
+        lines.undecodable = False
+        try:
+            data = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            data = f"Row is not valid CSV: {e}"
+        # DictReader.line_num is only updated for rows that parsed
+        yield reader.reader.line_num, NOT_UTF8 if lines.undecodable else data
+
+
+def read_ndjson(file):
+    lines = DecodedLines(file)
+    for line, text in enumerate(lines, 1):
+        if lines.undecodable:
+            lines.undecodable = False
+            yield line, NOT_UTF8
+            continue
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        yield line, data if isinstance(data, dict) else "Row is not a valid JSON object"
+
+
+def read_records(file, filename: str):
+    suffix = Path(filename or "").suffix.lower()
+    if suffix == ".csv":
+        return read_csv(file)
+    if suffix in (".ndjson", ".jsonl"):
+        return read_ndjson(file)
+    return None
+
+
+# validates the next batch of records, runs in a worker thread since the
+# upload is spooled to disk once it grows
+def validate_batch(records, schema: type[BaseModel], size: int, error_detail):
+    valid = []
+    errors = []
+    for line, data in islice(records, size):
+        if isinstance(data, str):
+            errors.append((line, data))
+            continue
+        try:
+            valid.append((line, schema.model_validate(data)))
+        except ValidationError as e:
+            errors.append((line, error_detail(e)))
+    return valid, errors, len(valid) + len(errors)
+
+
+# rejected rows are written as they come, the file is only kept when non-empty
+class ImportErrorFile:
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self.file = None
+        self.writer = None
+
+    def write(self, line: int, detail: str):
+        if self.file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(["line", "detail"])
+        self.writer.writerow([line, detail])
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+# error files are only fetched right after an import; the user directories
+# stay, an import may be about to write into one
+def purge_import_errors(directory: Path, max_age: timedelta):
+    expires = time.time() - max_age.total_seconds()
+    for path in directory.glob("*/*.csv"):
+        try:
+            if path.stat().st_mtime < expires:
+                path.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,9 +1,9 @@
 from email.message import EmailMessage
-from aiosmtplib import SMTP
 from ..core.config import settings
+from .email_dispatcher import email_dispatcher
 
 
-async def send_reset_email(to_email: str, token: str):
+def build_reset_email(to_email: str, token: str) -> EmailMessage:
     message = EmailMessage()
     message["From"] = settings.email_username
     message["To"] = to_email
@@ -33,15 +33,8 @@ async def send_reset_email(to_email: str, token: str):
         "Please use an email client that supports HTML to view this message."
     )
     message.add_alternative(html_content, subtype="html")
+    return message
+
 
-    try:
-        smtp = SMTP(
-            hostname=settings.email_host, port=settings.email_port, start_tls=True
-        )
-        await smtp.connect()
-        await smtp.login(settings.email_username, settings.email_password)
-        await smtp.send_message(message)
-        await smtp.quit()
-        print("Email sent successfully!")
-    except Exception as error:
-        print("Error sending email:", error)
+async def send_reset_email(to_email: str, token: str):
+    await email_dispatcher.submit(build_reset_email(to_email, token))
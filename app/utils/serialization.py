@@ -0,0 +1,71 @@
+from functools import cache
+from operator import attrgetter
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only
+from ..core.exceptions import InvalidFieldsException
+
+
+# asyncpg hands back its own UUID class, which orjson leaves to the fallback
+def dumps(content, option: int | None = None) -> bytes:
+    return orjson.dumps(content, default=str, option=option)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# rows from our own queries already satisfy the read schemas, so they are
+# copied field by field instead of validated again, and orjson encodes them;
+# routes keep their response_model, which leaves the OpenAPI schema as it was
+class RowSerializer:
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+        getter = attrgetter(*self.fields)
+        # attrgetter of a single name returns the bare value
+        self.getter = getter if len(self.fields) > 1 else lambda row: (getter(row),)
+
+    def dump(self, row) -> dict:
+        return dict(zip(self.fields, self.getter(row)))
+
+    def dump_many(self, rows) -> list[dict]:
+        fields, getter = self.fields, self.getter
+        return [dict(zip(fields, getter(row))) for row in rows]
+
+    def dumps_many(self, rows) -> bytes:
+        return dumps(self.dump_many(rows))
+
+
+# fields narrows the output to a sparse fieldset, see select_fields
+@cache
+def row_serializer(schema, fields: tuple[str, ...] | None = None) -> RowSerializer:
+    return RowSerializer(fields or tuple(schema.model_fields))
+
+
+# "?fields=id,name" as schema field names in schema order, None for all of them
+def select_fields(schema, fields: str | None) -> tuple[str, ...] | None:
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    allowed = list(schema.model_fields)
+    unknown = sorted(requested.difference(allowed))
+    if unknown or not requested:
+        raise InvalidFieldsException(unknown, allowed)
+    return tuple(name for name in allowed if name in requested)
+
+
+# the other columns are never selected; version stays for the ETag
+def load_fields(model, fields: tuple[str, ...]):
+    return load_only(*(getattr(model, name) for name in fields), model.version)
+
+
+def json_response(
+    content, etag: str | None = None, total: int | None = None
+) -> FastJSONResponse:
+    headers = {}
+    if etag is not None:
+        headers["ETag"] = etag
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,247 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import httpx
+from .scenarios import MIXES, VirtualUser
+from .seed import ROOT_DIR, has_tables, migrate, reset_schema, seed
+
+
+# latencies and status codes per endpoint for one concurrency level
+class Stats:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.recording = False
+
+    def record(self, endpoint: str, elapsed: float, status_code: int | None):
+        if not self.recording:
+            return
+        self.latencies.setdefault(endpoint, []).append(elapsed * 1000)
+        if status_code is None or status_code >= 400:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, duration: float) -> dict:
+        endpoints = {
+            endpoint: summarize(latencies, self.errors.get(endpoint, 0), duration)
+            for endpoint, latencies in sorted(self.latencies.items())
+        }
+        everything = [value for values in self.latencies.values() for value in values]
+        total = summarize(everything, sum(self.errors.values()), duration)
+        return {"total": total, "endpoints": endpoints}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies: list[float], errors: int, duration: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / duration, 2),
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# a throwaway Postgres when no database url is given; needs `pip install pgserver`
+def start_pgserver():
+    try:
+        import pgserver
+    except ImportError:
+        sys.exit("Pass --database-url or install pgserver for a throwaway database")
+    server = pgserver.get_server(os.path.join(ROOT_DIR, ".loadtest-pgdata"))
+    return server, server.get_uri()
+
+
+# the production settings, with SQL echo forced off so stdout is not the bottleneck
+def start_app(database_url: str, port: int, args) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(args.workers),
+            "--log-level", "warning",
+        ],
+        cwd=ROOT_DIR,
+        env={
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "APP_ENV": args.app_env,
+            "DB_ECHO": "false",
+        },
+    )
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(300):
+            if process.poll() is not None:
+                sys.exit("The app exited before it became ready")
+            try:
+                if (await client.get("/metrics")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    sys.exit("The app did not become ready in 30 seconds")
+
+
+async def run_virtual_user(user: VirtualUser, actions, weights, deadline: float):
+    await user.start()
+    while time.perf_counter() < deadline:
+        action = user.rng.choices(actions, weights)[0]
+        await action(user)
+
+
+# every level starts fresh clients; the first `warmup` seconds are not recorded
+async def run_level(args, base_url: str, concurrency: int) -> dict:
+    stats = Stats()
+    mix = MIXES[args.mix]
+    actions, weights = list(mix), list(mix.values())
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        users = [
+            VirtualUser(
+                client,
+                index % args.users,
+                stats,
+                random.Random(f"{args.seed}-{concurrency}-{index}"),
+            )
+            for index in range(concurrency)
+        ]
+        started = time.perf_counter()
+        deadline = started + args.warmup + args.duration
+        tasks = [
+            asyncio.create_task(run_virtual_user(user, actions, weights, deadline))
+            for user in users
+        ]
+        await asyncio.sleep(args.warmup)
+        stats.recording = True
+        measured = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - measured
+    return {"concurrency": concurrency, "duration_s": round(elapsed, 2)} | stats.summary(
+        elapsed
+    )
+
+
+def print_level(level: dict):
+    print(
+        f"\nconcurrency {level['concurrency']}: "
+        f"{level['total']['throughput_rps']} req/s, "
+        f"{level['total']['errors']} errors"
+    )
+    print(f"  {'endpoint':<40}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for endpoint, row in level["endpoints"].items():
+        print(
+            f"  {endpoint:<40}{row['throughput_rps']:>9}{row['p50_ms']:>9}"
+            f"{row['p95_ms']:>9}{row['p99_ms']:>9}{row['errors']:>8}"
+        )
+
+
+def git_revision() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+async def main(args):
+    pgserver = None
+    database_url = args.database_url
+    if database_url is None:
+        pgserver, database_url = start_pgserver()
+
+    if await has_tables(database_url):
+        if not args.reset:
+            sys.exit("The database already has tables, pass --reset to drop them")
+        await reset_schema(database_url)
+    migrate(database_url)
+    await seed(database_url, args.users, args.roots, args.children, args.products)
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    app = start_app(database_url, port, args)
+    try:
+        await wait_until_ready(base_url, app)
+        levels = []
+        for concurrency in args.concurrency:
+            level = await run_level(args, base_url, concurrency)
+            print_level(level)
+            levels.append(level)
+    finally:
+        app.terminate()
+        app.wait()
+        if pgserver is not None:
+            pgserver.cleanup()
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "mix": args.mix,
+        "seed": args.seed,
+        "app_env": args.app_env,
+        "workers": args.workers,
+        "dataset": {
+            "users": args.users,
+            "categories_per_user": args.roots * (1 + args.children + args.children**2),
+            "products_per_category": args.products,
+        },
+        "levels": levels,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+parser = argparse.ArgumentParser(
+    prog="python -m loadtest",
+    description="Seed a database, boot the app and measure it under load.",
+)
+parser.add_argument(
+    "--database-url",
+    default=os.environ.get("LOADTEST_DATABASE_URL"),
+    help="Postgres url of a database the test may wipe (default: LOADTEST_DATABASE_URL, else pgserver)",
+)
+parser.add_argument("--reset", action="store_true", help="drop existing tables first")
+parser.add_argument("--mix", choices=sorted(MIXES), default="browse")
+parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+parser.add_argument("--duration", type=float, default=30, help="seconds per level")
+parser.add_argument("--warmup", type=float, default=5, help="unrecorded seconds per level")
+parser.add_argument("--timeout", type=float, default=30, help="per request, in seconds")
+parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+parser.add_argument("--app-env", default="prod", help="APP_ENV of the app under test")
+parser.add_argument("--seed", type=int, default=1)
+parser.add_argument("--users", type=int, default=50)
+parser.add_argument("--roots", type=int, default=3, help="root categories per user")
+parser.add_argument("--children", type=int, default=3, help="children per category, two levels deep")
+parser.add_argument("--products", type=int, default=10, help="products per category")
+parser.add_argument("--output", default="loadtest-results.json")
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
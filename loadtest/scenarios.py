@@ -0,0 +1,171 @@
+import random
+import time
+import httpx
+from .seed import PASSWORD, user_email
+
+SEARCH_TERMS = ["product", "root", "load test", "product 3", "root 2 / 1", "-root"]
+
+
+# one simulated client: logs in as a seeded user and keeps the ids it has
+# seen so reads and updates hit rows that exist
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, index: int, stats, rng: random.Random):
+        self.client = client
+        self.email = user_email(index)
+        self.stats = stats
+        self.rng = rng
+        self.headers = {}
+        self.product_ids = []
+        self.category_ids = []
+        self.root_ids = []
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, url, headers=self.headers, **kwargs
+            )
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - started, None)
+            return None
+        self.stats.record(endpoint, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def start(self):
+        await login(self)
+        response = await self.request(
+            "GET /category/pagination", "GET", "/category/pagination?size=100"
+        )
+        if response is not None and response.status_code == 200:
+            categories = response.json()
+            self.category_ids = [category["id"] for category in categories]
+            self.root_ids = [
+                category["id"] for category in categories if not category["parent_id"]
+            ]
+        response = await self.request(
+            "GET /product/cursor", "GET", "/product/cursor?size=100"
+        )
+        if response is not None and response.status_code == 200:
+            self.product_ids = [product["id"] for product in response.json()["items"]]
+
+
+async def login(user: VirtualUser):
+    user.headers = {}
+    response = await user.request(
+        "POST /login",
+        "POST",
+        "/login",
+        data={"username": user.email, "password": PASSWORD},
+    )
+    if response is not None and response.status_code == 200:
+        user.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def list_products(user: VirtualUser):
+    await user.request("GET /product/", "GET", "/product/")
+
+
+async def paginate_products(user: VirtualUser):
+    page = user.rng.randint(1, 10)
+    await user.request(
+        "GET /product/pagination", "GET", f"/product/pagination?page={page}&size=20"
+    )
+
+
+async def browse_products(user: VirtualUser):
+    params = {"size": 20, "sort_by": user.rng.choice(["id", "name", "price"])}
+    for _ in range(user.rng.randint(1, 3)):
+        response = await user.request(
+            "GET /product/cursor", "GET", "/product/cursor", params=params
+        )
+        if response is None or response.status_code != 200:
+            return
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return
+        params["cursor"] = cursor
+
+
+async def search_products(user: VirtualUser):
+    await user.request(
+        "GET /product/search",
+        "GET",
+        "/product/search",
+        params={"q": user.rng.choice(SEARCH_TERMS)},
+    )
+
+
+async def get_product(user: VirtualUser):
+    if user.product_ids:
+        product_id = user.rng.choice(user.product_ids)
+        await user.request("GET /product/{product_id}", "GET", f"/product/{product_id}")
+
+
+async def nested_category(user: VirtualUser):
+    if user.root_ids:
+        root_id = user.rng.choice(user.root_ids)
+        await user.request(
+            "GET /category/nested/{category_id}", "GET", f"/category/nested/{root_id}"
+        )
+
+
+async def list_categories(user: VirtualUser):
+    page = user.rng.randint(1, 3)
+    await user.request(
+        "GET /category/pagination", "GET", f"/category/pagination?page={page}"
+    )
+
+
+async def crud_product(user: VirtualUser):
+    if not user.category_ids:
+        return
+    response = await user.request(
+        "POST /product/",
+        "POST",
+        "/product/",
+        json={
+            "name": f"crud {user.rng.getrandbits(64):x}",
+            "description": "created by the load test",
+            "price": user.rng.randint(1, 500),
+            "category_id": user.rng.choice(user.category_ids),
+        },
+    )
+    if response is None or response.status_code != 200:
+        return
+    product_id = response.json()["id"]
+    await user.request(
+        "PUT /product/{product_id}",
+        "PUT",
+        f"/product/{product_id}",
+        json={"price": user.rng.randint(1, 500)},
+    )
+    await user.request(
+        "DELETE /product/{product_id}", "DELETE", f"/product/{product_id}"
+    )
+
+
+# relative weights of the actions a virtual user picks from
+MIXES = {
+    "browse": {
+        list_products: 5,
+        paginate_products: 20,
+        browse_products: 20,
+        search_products: 15,
+        get_product: 20,
+        nested_category: 10,
+        list_categories: 8,
+        crud_product: 1,
+        login: 1,
+    },
+    "mixed": {
+        list_products: 5,
+        paginate_products: 15,
+        browse_products: 15,
+        search_products: 10,
+        get_product: 15,
+        nested_category: 10,
+        list_categories: 5,
+        crud_product: 20,
+        login: 5,
+    },
+}
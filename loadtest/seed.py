@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import asyncpg
+from passlib.context import CryptContext
+
+PASSWORD = "Password@123"
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def user_email(index: int) -> str:
+    return f"loadtest{index}@example.com"
+
+
+async def has_tables(database_url: str) -> bool:
+    connection = await asyncpg.connect(database_url)
+    try:
+        return await connection.fetchval("SELECT to_regclass('people') IS NOT NULL")
+    finally:
+        await connection.close()
+
+
+async def reset_schema(database_url: str):
+    connection = await asyncpg.connect(database_url)
+    try:
+        await connection.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+    finally:
+        await connection.close()
+
+
+def migrate(database_url: str):
+    # the real migrations, so the indexes under test are the shipped ones
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT_DIR,
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+# every user gets the same tree: roots, children and grandchildren, with
+# products spread over all of them; one bcrypt hash is shared by all users and
+# category names carry the user because older schemas keep them globally unique
+async def seed(
+    database_url: str, users: int, roots: int, children: int, products: int
+):
+    hashed_password = CryptContext(schemes=["bcrypt"]).hash(PASSWORD)
+    connection = await asyncpg.connect(database_url)
+    try:
+        async with connection.transaction():
+            await connection.execute(
+                """
+                INSERT INTO people (id, email, full_name, hashed_password, role)
+                SELECT gen_random_uuid(), 'loadtest' || u || '@example.com',
+                       'Load Test ' || u, $1, 'user'
+                FROM generate_series(0, $2 - 1) u
+                """,
+                hashed_password,
+                users,
+            )
+            await connection.execute(
+                """
+                INSERT INTO category (id, name, user_id, parent_id, path)
+                SELECT id, name, user_id, NULL, '/' || id || '/'
+                FROM (
+                    SELECT gen_random_uuid() AS id,
+                           'root ' || r || ' ' || split_part(people.email, '@', 1) AS name,
+                           people.id AS user_id
+                    FROM people, generate_series(1, $1) r
+                ) roots
+                """,
+                roots,
+            )
+            for level in (1, 2):
+                await connection.execute(
+                    """
+                    INSERT INTO category (id, name, user_id, parent_id, path)
+                    SELECT id, name, user_id, parent_id, path || id || '/'
+                    FROM (
+                        SELECT gen_random_uuid() AS id,
+                               category.name || ' / ' || c AS name,
+                               category.user_id, category.id AS parent_id,
+                               category.path
+                        FROM category, generate_series(1, $1) c
+                        WHERE length(category.path) = $2
+                    ) children
+                    """,
+                    children,
+                    # "/<uuid>/" is 38 characters, each level adds 37 more
+                    38 + 37 * (level - 1),
+                )
+            await connection.execute(
+                """
+                INSERT INTO product (id, name, description, price, user_id, category_id)
+                SELECT gen_random_uuid(), 'Product ' || p,
+                       'Load test product ' || p || ' in ' || category.name,
+                       1 + (p * 7919) % 500, category.user_id, category.id
+                FROM category, generate_series(1, $1) p
+                """,
+                products,
+            )
+        await connection.execute("ANALYZE")
+    finally:
+        await connection.close()
@@ -1,16 +1,69 @@
+import os
+
+os.environ.setdefault("APP_ENV", "test")
+
 from fastapi.testclient import TestClient
+import asyncio
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import status
 from app.main import app  
-from app.database import engine
+from app.database import DATABASE_URL, get_session
+from app.core.principals import principal_cache
+
+# every TestClient call runs on its own event loop, so connections must not be pooled
+engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+
+
+async def override_get_session():
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+app.dependency_overrides[get_session] = override_get_session
 client= TestClient(app)
 
+
+async def run_metadata(method):
+    async with engine.begin() as conn:
+        await conn.run_sync(method)
+
+
+# fails when the block runs more SQL statements than the budget allows
+@contextmanager
+def assert_max_queries(limit: int):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    assert len(statements) <= limit, (
+        f"{len(statements)} queries, budget is {limit}:\n" + "\n".join(statements)
+    )
+
+
+# the listener only runs under the app lifespan; query budgets assume it is
+# connected, so authenticated requests find their user in the cache
+@pytest.fixture()
+def principals_listening(monkeypatch):
+    monkeypatch.setattr(principal_cache, "ready", True)
+
+
 @pytest.fixture(autouse=True,scope="function")
 def test_db():
-    SQLModel.metadata.create_all(bind=engine)
+    asyncio.run(run_metadata(SQLModel.metadata.create_all))
     yield
-    SQLModel.metadata.drop_all(bind=engine)
+    asyncio.run(run_metadata(SQLModel.metadata.drop_all))
     
 @pytest.fixture()
 def test_user():
@@ -26,4 +79,53 @@ def test_login_success(test_user):
         data=response.json()
         token= data["access_token"]
         assert token is not None
-        return token
\ No newline at end of file
+        return token
+
+
+@pytest.fixture()
+def admin_headers():
+    client.post(
+        "/register",
+        json={
+            "email": "admin@example.com",
+            "full_name": "admin",
+            "password": "Password@123",
+        },
+    )
+
+    async def promote():
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE people SET role = 'admin'"))
+
+    asyncio.run(promote())
+    response = client.post(
+        "/login", data={"username": "admin@example.com", "password": "Password@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+# a second admin with data of their own, for checking ownership scoping
+@pytest.fixture()
+def other_headers():
+    client.post(
+        "/register",
+        json={
+            "email": "other@example.com",
+            "full_name": "other",
+            "password": "Password@123",
+        },
+    )
+
+    async def promote():
+        async with engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE people SET role = 'admin' WHERE email = 'other@example.com'")
+            )
+
+    asyncio.run(promote())
+    response = client.post(
+        "/login", data={"username": "other@example.com", "password": "Password@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,111 @@
+from uuid import uuid4
+from fastapi import status
+from .conftest import client
+from app.core.list_cache import list_cache
+
+
+def create_products(
+    headers, names: list[str], price: float = 10, category: str = "c"
+) -> list[dict]:
+    category = client.post("/category/", json={"name": category}, headers=headers)
+    category = category.json()
+    products = []
+    for name in names:
+        response = client.post(
+            "/product/",
+            json={
+                "name": name,
+                "description": "d",
+                "price": price,
+                "category_id": category["id"],
+            },
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        products.append(response.json())
+    return products
+
+
+def prices(headers) -> dict[str, float]:
+    response = client.get("/product/", headers=headers)
+    if response.status_code == status.HTTP_404_NOT_FOUND:
+        return {}
+    return {product["name"]: product["price"] for product in response.json()}
+
+
+def bulk_delete(headers, body: dict):
+    return client.request("DELETE", "/product/bulk", json=body, headers=headers)
+
+
+class TestBulkProducts:
+
+    def test_other_users_products_are_left_alone(self, admin_headers, other_headers):
+        mine = create_products(admin_headers, ["a", "b"])
+        theirs = create_products(other_headers, ["x", "y"], category="other")
+        ids = [product["id"] for product in mine + theirs]
+
+        response = client.put(
+            "/product/bulk",
+            json={"ids": ids, "values": {"price": 99}},
+            headers=admin_headers,
+        )
+        assert response.json() == {"affected": 2}
+        assert prices(admin_headers) == {"a": 99, "b": 99}
+        assert prices(other_headers) == {"x": 10, "y": 10}
+
+        response = bulk_delete(admin_headers, {"ids": ids})
+        assert response.json() == {"affected": 2}
+        assert prices(admin_headers) == {}
+        assert prices(other_headers) == {"x": 10, "y": 10}
+
+    def test_unknown_ids_are_not_counted(self, admin_headers):
+        products = create_products(admin_headers, ["a"])
+        ids = [products[0]["id"], str(uuid4())]
+
+        response = client.put(
+            "/product/bulk",
+            json={"ids": ids, "price_multiplier": 2},
+            headers=admin_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"affected": 1}
+        assert prices(admin_headers) == {"a": 20}
+
+        response = bulk_delete(admin_headers, {"ids": [str(uuid4())]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"affected": 0}
+
+    def test_filters_are_required(self, admin_headers):
+        create_products(admin_headers, ["a"])
+        response = bulk_delete(admin_headers, {})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert prices(admin_headers) == {"a": 10}
+
+    def test_bulk_update_changes_the_etag(self, admin_headers):
+        product = create_products(admin_headers, ["a"])[0]
+        url = f"/product/{product['id']}"
+        etag = client.get(url, headers=admin_headers).headers["ETag"]
+
+        client.put(
+            "/product/bulk",
+            json={"category_id": product["category_id"], "price_multiplier": 3},
+            headers=admin_headers,
+        )
+        response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["price"] == 30
+        assert response.headers["ETag"] != etag
+
+    def test_bulk_delete_drops_the_cached_list(self, admin_headers, monkeypatch):
+        monkeypatch.setattr(list_cache, "ready", True)
+        create_products(admin_headers, ["a", "b"], price=5)
+        create_products(admin_headers, ["c"], price=50, category="dear")
+
+        assert prices(admin_headers) == {"a": 5, "b": 5, "c": 50}
+        hits = list_cache.stats()["hits"]
+        assert prices(admin_headers) == {"a": 5, "b": 5, "c": 50}
+        assert list_cache.stats()["hits"] == hits + 1
+
+        response = bulk_delete(admin_headers, {"price_max": 10})
+        assert response.json() == {"affected": 2}
+        assert prices(admin_headers) == {"c": 50}
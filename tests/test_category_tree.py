@@ -0,0 +1,211 @@
+import asyncio
+import pytest
+from uuid import UUID
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .conftest import client, engine
+from app.core.exceptions import CategoryCycleException
+from app.models.category_model import Category
+from app.models.user_model import User
+from app.schemas.category_schema import CreateCategory
+from app.services.category_service import CategoryService
+
+
+def create(headers, name, parent_id=None) -> dict:
+    response = client.post(
+        "/category/", json={"name": name, "parent_id": parent_id}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def names(response) -> list[str]:
+    return [category["name"] for category in response.json()]
+
+
+async def read_paths() -> dict[str, str]:
+    async with AsyncSession(engine) as session:
+        rows = (await session.exec(select(Category.name, Category.path))).all()
+    return dict(rows)
+
+
+# d -> b -> c and a separate root a; b is the subtree that gets moved
+@pytest.fixture()
+def tree(admin_headers):
+    a = create(admin_headers, "a")
+    d = create(admin_headers, "d")
+    b = create(admin_headers, "b", d["id"])
+    c = create(admin_headers, "c", b["id"])
+    return {"a": a, "b": b, "c": c, "d": d}
+
+
+async def services(user_id: UUID):
+    first = AsyncSession(engine, expire_on_commit=False)
+    second = AsyncSession(engine, expire_on_commit=False)
+    user = await first.get(User, user_id)
+    return CategoryService(first, user), CategoryService(second, user)
+
+
+class TestCategoryTree:
+
+    def test_move_rewrites_the_whole_subtree(self, admin_headers, tree):
+        e = create(admin_headers, "e", tree["c"]["id"])
+        response = client.put(
+            f"/category/{tree['b']['id']}/parent",
+            json={"parent_id": tree["a"]["id"]},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["parent_id"] == tree["a"]["id"]
+
+        paths = asyncio.run(read_paths())
+        a, b, c = (tree[name]["id"] for name in "abc")
+        assert paths["b"] == f"/{a}/{b}/"
+        assert paths["c"] == f"/{a}/{b}/{c}/"
+        assert paths["e"] == f"/{a}/{b}/{c}/{e['id']}/"
+        assert paths["d"] == f"/{tree['d']['id']}/"
+
+        response = client.get(f"/category/{e['id']}/ancestors", headers=admin_headers)
+        assert names(response) == ["a", "b", "c"]
+        response = client.get(f"/category/{c}/ancestors", headers=admin_headers)
+        assert names(response) == ["a", "b"]
+        response = client.get(f"/category/{a}/descendants", headers=admin_headers)
+        assert names(response) == ["b", "c", "e"]
+        response = client.get(
+            f"/category/{tree['d']['id']}/descendants", headers=admin_headers
+        )
+        assert names(response) == []
+
+    def test_move_under_own_descendant_is_rejected(self, admin_headers, tree):
+        for parent in ("b", "c"):
+            response = client.put(
+                f"/category/{tree['b']['id']}/parent",
+                json={"parent_id": tree[parent]["id"]},
+                headers=admin_headers,
+            )
+            assert response.status_code == 400
+        paths = asyncio.run(read_paths())
+        assert paths["b"] == f"/{tree['d']['id']}/{tree['b']['id']}/"
+
+    def test_move_to_root(self, admin_headers, tree):
+        response = client.put(
+            f"/category/{tree['b']['id']}/parent",
+            json={"parent_id": None},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["parent_id"] is None
+
+        paths = asyncio.run(read_paths())
+        assert paths["b"] == f"/{tree['b']['id']}/"
+        assert paths["c"] == f"/{tree['b']['id']}/{tree['c']['id']}/"
+        response = client.get(
+            f"/category/{tree['b']['id']}/ancestors", headers=admin_headers
+        )
+        assert names(response) == []
+
+    def test_update_with_a_new_parent_moves_the_subtree(self, admin_headers, tree):
+        response = client.put(
+            f"/category/{tree['b']['id']}",
+            json={"name": "renamed", "parent_id": tree["a"]["id"]},
+            headers=admin_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["name"] == "renamed"
+
+        paths = asyncio.run(read_paths())
+        a, b, c = (tree[name]["id"] for name in "abc")
+        assert paths["renamed"] == f"/{a}/{b}/"
+        assert paths["c"] == f"/{a}/{b}/{c}/"
+        response = client.get(f"/category/{c}/ancestors", headers=admin_headers)
+        assert names(response) == ["a", "renamed"]
+
+        response = client.put(
+            f"/category/{a}",
+            json={"parent_id": c},
+            headers=admin_headers,
+        )
+        assert response.status_code == 400
+
+
+class TestCategoryTreeConcurrency:
+
+    def test_create_waits_for_a_move_of_its_ancestor(self, admin_headers, tree):
+        async def scenario():
+            mover, creator = await services(UUID(tree["a"]["user_id"]))
+            async with mover.session, creator.session:
+                moved = await mover.read_category(UUID(tree["b"]["id"]))
+                await mover.move_subtree(moved, UUID(tree["a"]["id"]))
+                late = asyncio.create_task(
+                    creator.create_category(
+                        CreateCategory(name="late", parent_id=tree["c"]["id"])
+                    )
+                )
+                await asyncio.sleep(0.3)
+                assert not late.done()
+                await mover.session.commit()
+                await late
+
+        asyncio.run(scenario())
+        self.assert_moved(admin_headers, tree)
+
+    def test_move_waits_for_a_create_under_its_subtree(self, admin_headers, tree):
+        async def scenario():
+            creator, mover = await services(UUID(tree["a"]["user_id"]))
+            async with mover.session, creator.session:
+                user_id = creator.current_user.id
+                parent_path = await creator.get_category_path(
+                    UUID(tree["c"]["id"]), user_id
+                )
+                move = asyncio.create_task(
+                    mover.move_category(UUID(tree["b"]["id"]), UUID(tree["a"]["id"]))
+                )
+                await asyncio.sleep(0.3)
+                assert not move.done()
+                late = Category(
+                    name="late", parent_id=UUID(tree["c"]["id"]), user_id=user_id
+                )
+                late.path = f"{parent_path}{late.id}/"
+                creator.session.add(late)
+                await creator.session.commit()
+                await move
+
+        asyncio.run(scenario())
+        self.assert_moved(admin_headers, tree)
+
+    def test_opposite_moves_cannot_both_pass_the_cycle_check(self, tree):
+        async def scenario():
+            first, second = await services(UUID(tree["a"]["user_id"]))
+            async with first.session, second.session:
+                moved = await first.read_category(UUID(tree["a"]["id"]))
+                await first.move_subtree(moved, UUID(tree["b"]["id"]))
+                opposite = asyncio.create_task(
+                    second.move_category(UUID(tree["b"]["id"]), UUID(tree["a"]["id"]))
+                )
+                await asyncio.sleep(0.3)
+                assert not opposite.done()
+                await first.session.commit()
+                with pytest.raises(CategoryCycleException):
+                    await opposite
+
+        asyncio.run(scenario())
+        paths = asyncio.run(read_paths())
+        assert paths["a"] == f"{paths['b']}{tree['a']['id']}/"
+
+    @staticmethod
+    def assert_moved(headers, tree):
+        paths = asyncio.run(read_paths())
+        assert paths["late"].startswith(paths["c"])
+        assert paths["c"].startswith(f"/{tree['a']['id']}/{tree['b']['id']}/")
+
+        late_id = next(
+            category["id"]
+            for category in client.get("/category/", headers=headers).json()
+            if category["name"] == "late"
+        )
+        response = client.get(f"/category/{late_id}/ancestors", headers=headers)
+        assert names(response) == ["a", "b", "c"]
+        response = client.get(f"/category/{tree['a']['id']}/descendants", headers=headers)
+        assert sorted(names(response)) == ["b", "c", "late"]
+        response = client.get(f"/category/{tree['d']['id']}/descendants", headers=headers)
+        assert names(response) == []
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from fastapi import status
+from .conftest import client, engine, assert_max_queries
+
+pytestmark = pytest.mark.usefixtures("principals_listening")
+
+
+async def analyze():
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE product"))
+
+
+class TestCounts:
+
+    def create_products(self, headers, count: int) -> str:
+        category = client.post("/category/", json={"name": "c"}, headers=headers)
+        category_id = category.json()["id"]
+        for index in range(count):
+            client.post(
+                "/product/",
+                json={
+                    "name": f"p{index}",
+                    "description": "d",
+                    "price": 1 + index,
+                    "category_id": category_id,
+                },
+                headers=headers,
+            )
+        return category_id
+
+    def test_pagination_total_in_the_same_query(self, admin_headers):
+        self.create_products(admin_headers, 5)
+
+        # token check and the page itself
+        with assert_max_queries(2):
+            response = client.get(
+                "/product/pagination?size=2&with_total=true", headers=admin_headers
+            )
+        assert len(response.json()) == 2
+        assert response.headers["X-Total-Count"] == "5"
+
+        response = client.get(
+            "/category/pagination?with_total=true", headers=admin_headers
+        )
+        assert response.headers["X-Total-Count"] == "1"
+
+        response = client.get("/product/pagination?size=2", headers=admin_headers)
+        assert "X-Total-Count" not in response.headers
+
+    def test_count_endpoints(self, admin_headers):
+        category_id = self.create_products(admin_headers, 5)
+
+        response = client.get("/product/count", headers=admin_headers)
+        assert response.json() == {"count": 5, "approximate": False}
+        response = client.get(
+            f"/product/count?category_id={category_id}&price_min=2&price_max=4",
+            headers=admin_headers,
+        )
+        assert response.json()["count"] == 3
+        response = client.get("/category/count", headers=admin_headers)
+        assert response.json()["count"] == 1
+
+    def test_approximate_count_for_admin(self, admin_headers):
+        self.create_products(admin_headers, 3)
+
+        # never analyzed yet, so the exact count is used
+        response = client.get(
+            "/product/all/count?approximate=true", headers=admin_headers
+        )
+        assert response.json() == {"count": 3, "approximate": False}
+
+        asyncio.run(analyze())
+        response = client.get(
+            "/product/all/count?approximate=true", headers=admin_headers
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"count": 3, "approximate": True}
+        response = client.get("/category/all/count", headers=admin_headers)
+        assert response.json() == {"count": 1, "approximate": False}
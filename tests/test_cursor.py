@@ -0,0 +1,93 @@
+import base64
+import json
+from fastapi import status
+from .conftest import client
+
+
+# 2 categories x 20 products: every name is used in both categories and
+# prices repeat every 4 products, so sort keys collide on page boundaries
+def create_products(headers) -> list[dict]:
+    products = []
+    for category_name in ("first", "second"):
+        category = client.post(
+            "/category/", json={"name": category_name}, headers=headers
+        ).json()
+        for index in range(20):
+            response = client.post(
+                "/product/",
+                json={
+                    "name": f"item{index:02d}",
+                    "description": "d",
+                    "price": 1 + index % 4,
+                    "category_id": category["id"],
+                },
+                headers=headers,
+            )
+            assert response.status_code == status.HTTP_200_OK, response.text
+            products.append(response.json())
+    return products
+
+
+def page_through(headers, **params) -> list[str]:
+    seen = []
+    cursor = None
+    while True:
+        query = {"size": 7, **params}
+        if cursor is not None:
+            query["cursor"] = cursor
+        response = client.get("/product/cursor", params=query, headers=headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        page = response.json()
+        assert len(page["items"]) <= 7
+        seen.extend(product["id"] for product in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def encode(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+class TestCursorPagination:
+
+    def test_pages_cover_every_row_once_in_order(self, admin_headers):
+        products = create_products(admin_headers)
+        for sort_by in ("id", "name", "price"):
+            for order in ("asc", "desc"):
+                expected = sorted(
+                    products,
+                    key=lambda product: (product[sort_by], product["id"]),
+                    reverse=order == "desc",
+                )
+                seen = page_through(admin_headers, sort_by=sort_by, order=order)
+                assert seen == [product["id"] for product in expected], (sort_by, order)
+
+    def test_filters_hold_across_pages(self, admin_headers):
+        products = create_products(admin_headers)
+        expected = sorted(
+            (product for product in products if product["price"] >= 3),
+            key=lambda product: (product["price"], product["id"]),
+        )
+        seen = page_through(admin_headers, sort_by="price", price_min=3)
+        assert seen == [product["id"] for product in expected]
+
+    def test_invalid_or_tampered_cursors_are_rejected(self, admin_headers):
+        create_products(admin_headers)
+        response = client.get(
+            "/product/cursor", params={"size": 5, "sort_by": "price"}, headers=admin_headers
+        )
+        cursor = response.json()["next_cursor"]
+        sort_by, order, value, last_id = json.loads(base64.urlsafe_b64decode(cursor))
+
+        bad = [
+            {"cursor": "not-a-cursor", "sort_by": "price"},
+            {"cursor": cursor, "sort_by": "name"},
+            {"cursor": cursor, "sort_by": "price", "order": "desc"},
+            {"cursor": encode([sort_by, order, "cheap", last_id]), "sort_by": "price"},
+            {"cursor": encode([sort_by, order, value, "nope"]), "sort_by": "price"},
+            {"cursor": encode([sort_by, order, value]), "sort_by": "price"},
+        ]
+        for params in bad:
+            response = client.get("/product/cursor", params=params, headers=admin_headers)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, params
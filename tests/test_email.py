@@ -0,0 +1,146 @@
+import asyncio
+import socket
+from email.message import EmailMessage
+import pytest
+from aiosmtpd.controller import Controller
+from app.core.config import settings
+from app.core.exceptions import EmailQueueFullException
+from app.utils.email_dispatcher import EmailDispatcher
+
+
+class RecordingHandler:
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.noop_replies = []
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_NOOP(self, server, session, envelope, arg):
+        if self.noop_replies:
+            return self.noop_replies.pop(0)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.replies:
+            return self.replies.pop(0)
+        self.messages.append(envelope)
+        self.sessions.add(id(session))
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture()
+def smtp_server(monkeypatch):
+    servers = []
+
+    def start(replies=()):
+        handler = RecordingHandler(replies)
+        port = free_port()
+        controller = Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        servers.append(controller)
+        monkeypatch.setattr(settings, "email_host", "127.0.0.1")
+        monkeypatch.setattr(settings, "email_port", port)
+        monkeypatch.setattr(settings, "email_start_tls", False)
+        monkeypatch.setattr(settings, "email_password", "")
+        monkeypatch.setattr(settings, "email_retry_backoff", 0)
+        return handler
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def make_message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = f"user{index}@example.com"
+    message["Subject"] = "test"
+    message.set_content("hello")
+    return message
+
+
+async def send_all(dispatcher: EmailDispatcher, count: int):
+    await dispatcher.start()
+    for index in range(count):
+        await dispatcher.submit(make_message(index))
+    await dispatcher.stop()
+
+
+class TestEmailDispatcher:
+
+    def test_reuses_pooled_connections(self, smtp_server, monkeypatch):
+        monkeypatch.setattr(settings, "email_pool_size", 2)
+        handler = smtp_server()
+        dispatcher = EmailDispatcher()
+
+        asyncio.run(send_all(dispatcher, 20))
+
+        assert len(handler.messages) == 20
+        assert len(handler.sessions) <= 2
+        stats = dispatcher.stats()
+        assert stats["sent"] == 20
+        assert stats["failed"] == 0
+        assert stats["connections"] == 0
+
+    def test_stale_pooled_connection_is_replaced(self, smtp_server, monkeypatch):
+        monkeypatch.setattr(settings, "email_pool_size", 1)
+        handler = smtp_server()
+        dispatcher = EmailDispatcher()
+
+        async def send_after_idle():
+            await dispatcher.start()
+            await dispatcher.submit(make_message(0))
+            await dispatcher.queue.join()
+            handler.noop_replies.append("421 Idle timeout")
+            await dispatcher.submit(make_message(1))
+            await dispatcher.stop()
+
+        asyncio.run(send_after_idle())
+
+        assert len(handler.messages) == 2
+        assert len(handler.sessions) == 2
+        assert dispatcher.retried == 0
+        assert dispatcher.connections == 0
+
+    def test_retries_transient_failures(self, smtp_server):
+        handler = smtp_server(replies=["451 Try again later"])
+        dispatcher = EmailDispatcher()
+
+        asyncio.run(send_all(dispatcher, 1))
+
+        assert len(handler.messages) == 1
+        assert dispatcher.retried == 1
+        assert dispatcher.sent == 1
+
+    def test_permanent_failure_is_not_retried(self, smtp_server):
+        handler = smtp_server(replies=["550 Mailbox unavailable"])
+        dispatcher = EmailDispatcher()
+
+        asyncio.run(send_all(dispatcher, 1))
+
+        assert handler.messages == []
+        assert dispatcher.retried == 0
+        assert dispatcher.failed == 1
+
+    def test_full_queue_is_rejected(self, smtp_server, monkeypatch):
+        monkeypatch.setattr(settings, "email_queue_size", 1)
+        smtp_server()
+        dispatcher = EmailDispatcher()
+
+        async def overfill():
+            await dispatcher.start()
+            await dispatcher.submit(make_message(0))
+            with pytest.raises(EmailQueueFullException) as error:
+                await dispatcher.submit(make_message(1))
+            await dispatcher.stop()
+            return error.value
+
+        error = asyncio.run(overfill())
+        assert error.status_code == 503
+        assert dispatcher.rejected == 1
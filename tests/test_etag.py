@@ -0,0 +1,76 @@
+from fastapi import status
+from .conftest import client, assert_max_queries
+
+
+class TestEtag:
+
+    def test_product_conditional_get(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        product = client.post(
+            "/product/",
+            json={
+                "name": "p",
+                "description": "d",
+                "price": 10,
+                "category_id": category["id"],
+            },
+            headers=admin_headers,
+        ).json()
+        url = f"/product/{product['id']}"
+
+        response = client.get(url, headers=admin_headers)
+        etag = response.headers["ETag"]
+        assert response.status_code == status.HTTP_200_OK
+
+        # token check, user lookup and the row lookup
+        with assert_max_queries(3):
+            response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        client.put(url, json={"price": 20}, headers=admin_headers)
+        # a stale ETag costs no second lookup
+        with assert_max_queries(3):
+            response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["price"] == 20
+        assert response.headers["ETag"] != etag
+
+    def test_category_conditional_get(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        url = f"/category/{category['id']}"
+        etag = client.get(url, headers=admin_headers).headers["ETag"]
+
+        response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.put(url, json={"name": "renamed"}, headers=admin_headers)
+        response = client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_list_etag_changes_with_the_rows(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        item = {"description": "d", "price": 1, "category_id": category["id"]}
+        client.post("/product/", json={**item, "name": "a"}, headers=admin_headers)
+
+        for url in ["/product/", "/product/pagination", "/product/cursor"]:
+            etag = client.get(url, headers=admin_headers).headers["ETag"]
+            response = client.get(
+                url, headers={**admin_headers, "If-None-Match": etag}
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED, url
+
+        etag = client.get("/product/", headers=admin_headers).headers["ETag"]
+        client.post("/product/", json={**item, "name": "b"}, headers=admin_headers)
+        response = client.get(
+            "/product/", headers={**admin_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
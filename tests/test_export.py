@@ -0,0 +1,56 @@
+import json
+from fastapi import status
+from .conftest import client
+from app.core.config import settings
+from app.schemas.product_schema import ReadProduct
+
+
+def create_products(headers, count: int, category: str = "c") -> set[str]:
+    category = client.post("/category/", json={"name": category}, headers=headers)
+    items = [
+        {
+            "name": f"p{index}",
+            "description": "d",
+            "price": 1 + index,
+            "category_id": category.json()["id"],
+        }
+        for index in range(count)
+    ]
+    response = client.post("/product/bulk", json=items, headers=headers)
+    assert response.json()["created"] == count
+    return {f"p{index}" for index in range(count)}
+
+
+def export(url: str, headers) -> list[dict]:
+    response = client.get(url, headers=headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestExport:
+
+    def test_export_streams_every_batch(self, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "export_batch_size", 7)
+        names = create_products(admin_headers, 30)
+
+        rows = export("/product/export", admin_headers)
+        assert len(rows) == 30
+        assert {row["name"] for row in rows} == names
+        # one JSON object per line, in the shape of the read schema
+        assert all(list(row) == list(ReadProduct.model_fields) for row in rows)
+
+    def test_export_is_scoped_to_the_user(self, admin_headers, other_headers):
+        mine = create_products(admin_headers, 3)
+        create_products(other_headers, 2, category="other")
+
+        rows = export("/product/export", admin_headers)
+        assert {row["name"] for row in rows} == mine
+        assert len(export("/product/export", other_headers)) == 2
+        assert len(export("/product/all/export", admin_headers)) == 5
+
+    def test_empty_export(self, admin_headers):
+        response = client.get("/product/export", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b""
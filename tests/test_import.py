@@ -0,0 +1,81 @@
+import csv
+import io
+from fastapi import status
+from .conftest import client
+from app.core.constants import duplicate_product_exception, item_not_found_exception
+
+
+def create_category(headers, name: str) -> str:
+    response = client.post("/category/", json={"name": name}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()["id"]
+
+
+class TestImport:
+
+    def test_import_reports_every_rejected_line(self, admin_headers, other_headers):
+        mine = create_category(admin_headers, "mine")
+        theirs = create_category(other_headers, "theirs")
+        client.post(
+            "/product/",
+            json={"name": "existing", "description": "d", "price": 1, "category_id": mine},
+            headers=admin_headers,
+        )
+        upload = (
+            "name,description,price,category_id\n"
+            f"fresh,d,2,{mine}\n"
+            f"broken,d,not a price,{mine}\n"
+            f"existing,d,3,{mine}\n"
+            f"stolen,d,4,{theirs}\n"
+            f"fresh,d,5,{mine}\n"
+        )
+
+        response = client.post(
+            "/product/import",
+            files={"file": ("products.csv", upload.encode())},
+            headers=admin_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+        result = response.json()
+        assert result["imported"] == 1
+        assert result["rejected"] == 4
+
+        products = client.get("/product/", headers=admin_headers).json()
+        assert sorted((p["name"], p["price"]) for p in products) == [
+            ("existing", 1),
+            ("fresh", 2),
+        ]
+        assert client.get("/product/", headers=other_headers).status_code == 404
+
+        response = client.get(result["error_file"], headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["line", "detail"]
+        assert [int(line) for line, _ in rows[1:]] == [3, 4, 5, 6]
+        details = dict((int(line), detail) for line, detail in rows[1:])
+        assert details[3].startswith("price")
+        assert details[4] == duplicate_product_exception
+        assert details[5] == item_not_found_exception("Category", theirs)
+        assert details[6] == duplicate_product_exception
+
+    def test_clean_import_has_no_error_file(self, admin_headers):
+        category = create_category(admin_headers, "c")
+        upload = "\n".join(
+            f'{{"name": "p{index}", "description": "d", "price": 1, "category_id": "{category}"}}'
+            for index in range(3)
+        )
+        response = client.post(
+            "/product/import",
+            files={"file": ("products.ndjson", upload.encode())},
+            headers=admin_headers,
+        )
+        assert response.json()["imported"] == 3
+        assert response.json()["error_file"] is None
+
+    def test_unsupported_format_is_rejected(self, admin_headers):
+        response = client.post(
+            "/product/import",
+            files={"file": ("products.xlsx", b"whatever")},
+            headers=admin_headers,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,46 @@
+import csv
+import io
+import os
+import time
+from datetime import timedelta
+from app.utils.importer import read_csv, read_ndjson, purge_import_errors, NOT_UTF8
+
+
+class TestImporter:
+
+    def test_bad_csv_rows_do_not_stop_the_import(self):
+        too_long = b"c" * (csv.field_size_limit() + 1)
+        upload = io.BytesIO(
+            b"name,price\n"
+            b"a,1\n"
+            b"\xff\xfe,2\n"
+            + too_long + b",3\n"
+            b"d,4\n"
+        )
+        rows = list(read_csv(upload))
+        assert rows[0] == (2, {"name": "a", "price": "1"})
+        assert rows[1] == (3, NOT_UTF8)
+        assert rows[2][0] == 4 and rows[2][1].startswith("Row is not valid CSV")
+        assert rows[3] == (5, {"name": "d", "price": "4"})
+
+    def test_bad_ndjson_rows_do_not_stop_the_import(self):
+        upload = io.BytesIO(b'{"name": "a"}\n{"name": "\xe9"}\n[]\n{"name": "d"}\n')
+        assert list(read_ndjson(upload)) == [
+            (1, {"name": "a"}),
+            (2, NOT_UTF8),
+            (3, "Row is not a valid JSON object"),
+            (4, {"name": "d"}),
+        ]
+
+    def test_expired_error_files_are_purged(self, tmp_path):
+        user_dir = tmp_path / "user"
+        user_dir.mkdir()
+        old, new = user_dir / "old.csv", user_dir / "new.csv"
+        old.write_text("line,detail\n")
+        new.write_text("line,detail\n")
+        two_days_ago = time.time() - 2 * 24 * 3600
+        os.utime(old, (two_days_ago, two_days_ago))
+
+        purge_import_errors(tmp_path, timedelta(hours=24))
+        assert not old.exists()
+        assert new.exists()
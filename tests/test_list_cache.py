@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from fastapi import status
+from .conftest import client
+from app.core.cache import TTLCache
+from app.core.list_cache import ListCache, PRODUCT_LIST, list_cache
+from app.schemas.product_schema import ReadProduct
+
+
+# the listener only runs under the app lifespan; act as if it were connected
+@pytest.fixture(autouse=True)
+def listening(monkeypatch):
+    monkeypatch.setattr(list_cache, "ready", True)
+
+
+class TestListCache:
+
+    def test_lists_are_cached_until_a_write(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        item = {"description": "d", "price": 1, "category_id": category["id"]}
+        product = client.post(
+            "/product/", json={**item, "name": "a"}, headers=admin_headers
+        ).json()
+
+        first = client.get("/product/", headers=admin_headers)
+        hits = list_cache.stats()["hits"]
+        second = client.get("/product/", headers=admin_headers)
+        assert list_cache.stats()["hits"] == hits + 1
+        assert second.content == first.content
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+        client.put(
+            f"/product/{product['id']}", json={"price": 5}, headers=admin_headers
+        )
+        response = client.get("/product/", headers=admin_headers)
+        assert response.json()[0]["price"] == 5
+
+        client.post("/product/", json={**item, "name": "b"}, headers=admin_headers)
+        assert len(client.get("/product/", headers=admin_headers).json()) == 2
+
+        client.delete(f"/product/{product['id']}", headers=admin_headers)
+        assert len(client.get("/product/", headers=admin_headers).json()) == 1
+
+    def test_deleting_a_category_drops_both_lists(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        client.post(
+            "/product/",
+            json={
+                "name": "a",
+                "description": "d",
+                "price": 1,
+                "category_id": category["id"],
+            },
+            headers=admin_headers,
+        )
+        assert client.get("/category/", headers=admin_headers).status_code == 200
+        assert client.get("/product/", headers=admin_headers).status_code == 200
+
+        client.delete(f"/category/{category['id']}", headers=admin_headers)
+        response = client.get("/category/", headers=admin_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = client.get("/product/", headers=admin_headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalidation_during_the_query_is_not_overwritten(self):
+        cache = ListCache(TTLCache(max_size=10, ttl=60))
+        asyncio.run(cache.resync())
+        user_id = uuid4()
+        generation = cache.generation(PRODUCT_LIST, user_id)
+        cache.invalidate(ListCache.key(PRODUCT_LIST, user_id))
+        cache.set(PRODUCT_LIST, user_id, [], ReadProduct, generation)
+        assert cache.get(PRODUCT_LIST, user_id) is None
+
+        generation = cache.generation(PRODUCT_LIST, user_id)
+        cache.set(PRODUCT_LIST, user_id, [], ReadProduct, generation)
+        assert cache.get(PRODUCT_LIST, user_id) is not None
+
+    def test_nothing_is_cached_while_disconnected(self):
+        cache = ListCache(TTLCache(max_size=10, ttl=60))
+        user_id = uuid4()
+        generation = cache.generation(PRODUCT_LIST, user_id)
+        cache.set(PRODUCT_LIST, user_id, [], ReadProduct, generation)
+        asyncio.run(cache.resync())
+        assert cache.get(PRODUCT_LIST, user_id) is None
+
+        generation = cache.generation(PRODUCT_LIST, user_id)
+        cache.set(PRODUCT_LIST, user_id, [], ReadProduct, generation)
+        cache.disconnect()
+        assert cache.get(PRODUCT_LIST, user_id) is None
@@ -0,0 +1,19 @@
+import logging
+from app.core.logers import SamplingFilter
+
+
+def make_record(exc_type: str) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "app", logging.WARNING, "app/core/exceptions.py", 40, "failed", None, None
+    )
+    record.exc_type = exc_type
+    return record
+
+
+class TestSamplingFilter:
+
+    def test_failures_are_sampled_per_exception_type(self):
+        sampler = SamplingFilter(window=60, burst=2)
+        timeouts = [sampler.filter(make_record("TimeoutError")) for _ in range(5)]
+        assert timeouts == [True, True, False, False, False]
+        assert sampler.filter(make_record("IntegrityError"))
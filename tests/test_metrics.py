@@ -0,0 +1,22 @@
+from fastapi import status
+from uuid import uuid4
+from .conftest import client
+
+
+class TestMetrics:
+
+    def test_requests_are_labelled_by_route_template(self):
+        for _ in range(3):
+            client.get(f"/product/{uuid4()}")
+        client.get("/no-such-route")
+
+        response = client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        body = response.text
+        assert (
+            'http_requests_total{method="GET",route="/product/{product_id}",status="401"}'
+            in body
+        )
+        assert 'route="<unmatched>"' in body
+        assert "http_request_db_seconds_bucket" in body
+        assert "http_requests_in_flight" in body
@@ -0,0 +1,73 @@
+import asyncio
+from fastapi import status
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from .conftest import client
+from app.core.config import settings
+from app.core.pool import MonitoredQueuePool, pool_stats
+from app.database import DATABASE_URL
+from app.routes import monitoring_route
+from app.schemas.monitoring_schema import PoolStatus
+
+
+def user_headers() -> dict:
+    credentials = {
+        "email": "user@example.com",
+        "full_name": "user",
+        "password": "Password@123",
+    }
+    client.post("/register", json=credentials)
+    response = client.post(
+        "/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestPoolMonitoring:
+
+    def test_users_are_forbidden(self, admin_headers):
+        response = client.get("/monitoring/pool", headers=user_headers())
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_reports_queue_pool_counters(self, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "db_max_overflow", 1)
+        checkouts, timeouts = pool_stats.checkouts, pool_stats.timeouts
+
+        # two pooled connections and one overflow are held, a fourth times out
+        async def read_status_while_busy():
+            pooled = create_async_engine(
+                DATABASE_URL,
+                poolclass=MonitoredQueuePool,
+                pool_size=2,
+                max_overflow=1,
+                pool_timeout=0.2,
+            )
+            monkeypatch.setattr(monitoring_route, "engine", pooled)
+            held = [await pooled.connect() for _ in range(3)]
+            try:
+                try:
+                    await pooled.connect()
+                except exc.TimeoutError:
+                    pass
+                return client.get("/monitoring/pool", headers=admin_headers)
+            finally:
+                for connection in held:
+                    await connection.close()
+                await pooled.dispose()
+
+        response = asyncio.run(read_status_while_busy())
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert list(data) == list(PoolStatus.model_fields)
+        assert data["pool_class"] == "MonitoredQueuePool"
+        assert data["size"] == 2
+        assert data["checked_out"] == 3
+        assert data["idle"] == 0
+        assert data["overflow"] == 1
+        assert data["max_overflow"] == 1
+        assert data["timeout"] == 0.2
+        assert data["checkouts"] == checkouts + 4
+        assert data["timeouts"] == timeouts + 1
+        assert data["max_wait_ms"] >= 200
+        assert 0 < data["avg_wait_ms"] <= data["max_wait_ms"]
@@ -0,0 +1,25 @@
+import asyncio
+import time
+from app.core.passwords import PasswordPool
+
+
+class TestPasswordPool:
+
+    def test_cancelled_callers_leave_the_queue(self):
+        async def scenario():
+            pool = PasswordPool(workers=1, max_queue=5)
+            busy = asyncio.create_task(pool.run(time.sleep, 0.2))
+            await asyncio.sleep(0.05)
+            waiting = [asyncio.create_task(pool.run(time.sleep, 0)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            assert pool.stats()["queued"] == 3
+            for task in waiting:
+                task.cancel()
+            await asyncio.gather(*waiting, return_exceptions=True)
+            await busy
+            return pool.stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["queued"] == 0
+        assert stats["running"] == 0
+        assert stats["completed"] == 1
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .conftest import client, engine
+from app.main import app
+from app.core.principals import principal_cache, publish_user_change
+
+ADMIN_ONLY = "/monitoring/principal-cache"
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+# a role change made by another worker: the row, and the NOTIFY when notify is set
+async def demote(email: str, notify: bool) -> None:
+    async with AsyncSession(engine) as session:
+        user_id = (
+            await session.exec(
+                text("UPDATE people SET role = 'user' WHERE email = :email RETURNING id")
+                .bindparams(email=email)
+            )
+        ).scalar_one()
+        if notify:
+            await publish_user_change(session, user_id)
+        await session.commit()
+
+
+class TestPrincipalCache:
+
+    def test_role_change_from_another_worker_is_seen(self, admin_headers):
+        with TestClient(app) as lifespan_client:
+            wait_until(lambda: principal_cache.ready)
+            for _ in range(2):
+                response = lifespan_client.get(ADMIN_ONLY, headers=admin_headers)
+                assert response.status_code == status.HTTP_200_OK
+            assert principal_cache.stats()["hits"] >= 1
+
+            asyncio.run(demote("admin@example.com", notify=True))
+            wait_until(
+                lambda: lifespan_client.get(ADMIN_ONLY, headers=admin_headers).status_code
+                == status.HTTP_403_FORBIDDEN
+            )
+        assert not principal_cache.ready
+
+    def test_cache_is_bypassed_while_disconnected(self, admin_headers):
+        assert not principal_cache.ready
+        response = client.get(ADMIN_ONLY, headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        # no NOTIFY reaches a worker without a listener; the next request
+        # has to read the user again
+        asyncio.run(demote("admin@example.com", notify=False))
+        response = client.get(ADMIN_ONLY, headers=admin_headers)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,77 @@
+import pytest
+from fastapi import status
+from .conftest import client, assert_max_queries
+
+pytestmark = pytest.mark.usefixtures("principals_listening")
+
+
+def create_tree(headers, name: str, depth: int, width: int) -> str:
+    root = client.post("/category/", json={"name": name}, headers=headers).json()
+    parents = [root["id"]]
+    for level in range(depth):
+        children = []
+        for parent in parents[:2]:
+            for index in range(width):
+                response = client.post(
+                    "/category/",
+                    json={
+                        "name": f"{name}-{level}-{parent}-{index}",
+                        "parent_id": parent,
+                    },
+                    headers=headers,
+                )
+                children.append(response.json()["id"])
+        parents = children
+    return root["id"]
+
+
+class TestQueryBudget:
+
+    # token revocation check and user lookup, nothing per route
+    def test_authenticated_request(self, admin_headers):
+        with assert_max_queries(2):
+            response = client.get("/me", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_category_tree_queries_do_not_grow_with_the_tree(self, admin_headers):
+        small = create_tree(admin_headers, "small", depth=1, width=2)
+        large = create_tree(admin_headers, "large", depth=4, width=3)
+
+        for root in (small, large):
+            with assert_max_queries(2):
+                response = client.get(f"/category/nested/{root}", headers=admin_headers)
+            assert response.status_code == status.HTTP_200_OK
+
+            with assert_max_queries(3):
+                response = client.get(
+                    f"/category/{root}/descendants", headers=admin_headers
+                )
+            assert response.status_code == status.HTTP_200_OK
+
+    def test_product_endpoints(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        items = [
+            {
+                "name": f"p{index}",
+                "description": "d",
+                "price": 1 + index,
+                "category_id": category["id"],
+            }
+            for index in range(30)
+        ]
+        # token check, category check, the insert and the list cache notify
+        with assert_max_queries(4):
+            response = client.post("/product/bulk", json=items, headers=admin_headers)
+        assert response.json()["created"] == 30
+
+        for url in [
+            "/product/",
+            "/product/pagination",
+            "/product/cursor?size=5",
+            "/product/search?q=p1",
+        ]:
+            with assert_max_queries(2):
+                response = client.get(url, headers=admin_headers)
+            assert response.status_code == status.HTTP_200_OK, (url, response.text)
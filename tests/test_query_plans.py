@@ -0,0 +1,131 @@
+import asyncio
+from sqlalchemy import event, text
+from fastapi import status
+from .conftest import client, engine
+
+SEED_USERS = 40
+SEED_CATEGORIES = 50
+SEED_PRODUCTS = 10
+
+# other users' rows, so an index only pays off when user_id is used
+SEED_SQL = [
+    f"""
+    INSERT INTO people (id, email, full_name, hashed_password, role)
+    SELECT gen_random_uuid(), 'seed' || u || '@example.com', 'seed', 'x', 'user'
+    FROM generate_series(1, {SEED_USERS}) u
+    """,
+    """
+    INSERT INTO category (id, name, user_id, parent_id, path)
+    SELECT id, name, user_id, NULL, '/' || id || '/'
+    FROM (
+        SELECT gen_random_uuid() AS id, 'c' || c AS name, people.id AS user_id
+        FROM people, generate_series(1, :categories) c
+    ) seeded
+    """,
+    """
+    INSERT INTO category (id, name, user_id, parent_id, path)
+    SELECT id, 'child of ' || name, user_id, parent_id, path || id || '/'
+    FROM (
+        SELECT gen_random_uuid() AS id, name, user_id, id AS parent_id, path
+        FROM category
+    ) seeded
+    """,
+    """
+    INSERT INTO product (id, name, description, price, user_id, category_id)
+    SELECT gen_random_uuid(), 'p' || p, 'd', 1 + p % 97, category.user_id, category.id
+    FROM category, generate_series(1, :products) p
+    """,
+    "ANALYZE",
+]
+
+
+async def seed():
+    async with engine.begin() as conn:
+        for statement in SEED_SQL:
+            await conn.execute(
+                text(statement),
+                {"categories": SEED_CATEGORIES, "products": SEED_PRODUCTS},
+            )
+
+
+async def explain(statements):
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plans.append((statement, result.scalar()[0]["Plan"]))
+    return plans
+
+
+def seq_scans(plan):
+    scans = []
+    if plan["Node Type"] == "Seq Scan":
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(seq_scans(child))
+    return scans
+
+
+class TestQueryPlans:
+
+    def test_product_and_category_queries_use_indexes(self, admin_headers):
+        headers = admin_headers
+        category = client.post("/category/", json={"name": "root"}, headers=headers)
+        category_id = category.json()["id"]
+        child = client.post(
+            "/category/",
+            json={"name": "child", "parent_id": category_id},
+            headers=headers,
+        ).json()["id"]
+        client.post(
+            "/product/",
+            json={
+                "name": "p",
+                "description": "d",
+                "price": 5,
+                "category_id": child,
+            },
+            headers=headers,
+        )
+        asyncio.run(seed())
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                statements.append((statement, parameters))
+
+        requests = [
+            "/product/",
+            "/product/pagination?price_min=2&price_max=50",
+            f"/product/pagination?category_id={child}&price_min=2&price_max=50",
+            "/product/pagination?with_total=true",
+            "/product/count?price_max=50",
+            f"/product/count?category_id={child}&price_min=2",
+            "/product/cursor?sort_by=price",
+            f"/product/cursor?category_id={child}&price_min=2",
+            "/product/search?q=p7",
+            "/category/pagination",
+            f"/category/pagination?parent_id={category_id}",
+            "/category/pagination?with_total=true",
+            "/category/count",
+            f"/category/count?parent_id={category_id}",
+            f"/category/nested/{category_id}",
+            f"/category/{child}/ancestors",
+            f"/category/{category_id}/descendants",
+        ]
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            for url in requests:
+                response = client.get(url, headers=headers)
+                assert response.status_code == status.HTTP_200_OK, (url, response.text)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        plans = asyncio.run(explain(statements))
+        assert plans
+        for statement, plan in plans:
+            scanned = {"product", "category"} & set(seq_scans(plan))
+            assert not scanned, f"sequential scan on {scanned}:\n{statement}"
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+import jwt
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .conftest import client, engine
+from app.main import app
+from app.core.config import settings
+from app.core.revocation import revocation_cache, publish_revocation
+from app.models.blacklistedtoken_model import BlacklistedToken
+
+CREDENTIALS = {"username": "admin@example.com", "password": "Password@123"}
+
+
+def login(test_client: TestClient) -> dict:
+    response = test_client.post("/login", data=CREDENTIALS)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+# what the logout of another worker leaves behind: the row and the NOTIFY
+async def revoke_elsewhere(headers: dict):
+    token = headers["Authorization"].removeprefix("Bearer ")
+    data = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    expires_at = datetime.fromtimestamp(data["exp"], timezone.utc)
+    async with AsyncSession(engine) as session:
+        session.add(
+            BlacklistedToken(
+                access_token=data["jti"],
+                refresh_token=data["jti"],
+                expires_at=expires_at + timedelta(days=1),
+            )
+        )
+        await publish_revocation(session, data["jti"], expires_at)
+        await session.commit()
+
+
+class TestRevocation:
+
+    def test_logged_out_token_is_rejected_from_the_cache(self, admin_headers):
+        with TestClient(app) as lifespan_client:
+            wait_until(lambda: revocation_cache.ready)
+            headers = login(lifespan_client)
+            assert lifespan_client.get("/me", headers=headers).status_code == 200
+
+            response = lifespan_client.post("/logout", headers=headers)
+            assert response.status_code == status.HTTP_200_OK, response.text
+            response = lifespan_client.get("/me", headers=headers)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+            assert revocation_cache.ready
+
+    def test_revocation_from_another_worker_arrives_by_notify(self, admin_headers):
+        with TestClient(app) as lifespan_client:
+            wait_until(lambda: revocation_cache.ready)
+            headers = login(lifespan_client)
+            assert lifespan_client.get("/me", headers=headers).status_code == 200
+
+            asyncio.run(revoke_elsewhere(headers))
+            wait_until(
+                lambda: lifespan_client.get("/me", headers=headers).status_code
+                == status.HTTP_401_UNAUTHORIZED
+            )
+
+    def test_logged_out_token_is_rejected_from_the_table(
+        self, admin_headers, monkeypatch
+    ):
+        monkeypatch.setattr(revocation_cache, "ready", False)
+        headers = login(client)
+        assert client.get("/me", headers=headers).status_code == 200
+
+        response = client.post("/logout", headers=headers)
+        assert response.status_code == status.HTTP_200_OK, response.text
+        assert revocation_cache.is_revoked("anything") is None
+        response = client.get("/me", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        other = login(client)
+        asyncio.run(revoke_elsewhere(other))
+        response = client.get("/me", headers=other)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
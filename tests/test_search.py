@@ -0,0 +1,102 @@
+from fastapi import status
+from .conftest import client
+
+
+def create_products(headers, products: list[tuple[str, str]], category: str = "c"):
+    category = client.post("/category/", json={"name": category}, headers=headers)
+    for name, description in products:
+        response = client.post(
+            "/product/",
+            json={
+                "name": name,
+                "description": description,
+                "price": 1,
+                "category_id": category.json()["id"],
+            },
+            headers=headers,
+        )
+        assert response.status_code == status.HTTP_200_OK, response.text
+
+
+def search(headers, q: str, **params) -> dict:
+    response = client.get("/product/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == status.HTTP_200_OK, response.text
+    return response.json()
+
+
+def names(page: dict) -> list[str]:
+    return [product["name"] for product in page["items"]]
+
+
+class TestSearch:
+
+    def test_names_rank_above_descriptions(self, admin_headers):
+        create_products(
+            admin_headers,
+            [
+                ("plain stool", "sturdy lamp stand"),
+                ("desk lamp", "bright and small"),
+                ("lamp lamp", "a lamp with a spare lamp"),
+                ("unrelated", "nothing to see"),
+            ],
+        )
+        assert names(search(admin_headers, "lamp")) == [
+            "lamp lamp",
+            "desk lamp",
+            "plain stool",
+        ]
+
+    def test_websearch_syntax(self, admin_headers):
+        create_products(
+            admin_headers,
+            [
+                ("red chair", "d"),
+                ("chair red", "d"),
+                ("blue chair", "d"),
+                ("red wooden chair", "d"),
+            ],
+        )
+        assert names(search(admin_headers, '"red chair"')) == ["red chair"]
+        assert sorted(names(search(admin_headers, "chair -red"))) == ["blue chair"]
+        assert sorted(names(search(admin_headers, "blue or wooden"))) == [
+            "blue chair",
+            "red wooden chair",
+        ]
+        # stop words alone leave nothing to match, not an error
+        assert names(search(admin_headers, "the")) == []
+
+    def test_other_users_products_are_not_found(self, admin_headers, other_headers):
+        create_products(admin_headers, [("my lamp", "d")])
+        create_products(other_headers, [("their lamp", "d")], category="other")
+        assert names(search(admin_headers, "lamp")) == ["my lamp"]
+        assert names(search(other_headers, "lamp")) == ["their lamp"]
+
+    def test_equal_ranks_page_without_gaps_or_repeats(self, admin_headers):
+        create_products(admin_headers, [(f"lamp {index}", "d") for index in range(25)])
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"size": 10}
+            if cursor is not None:
+                params["cursor"] = cursor
+            page = search(admin_headers, "lamp", **params)
+            seen.extend(product["id"] for product in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+        # equal ranks fall back to the id order
+        assert seen == sorted(seen)
+
+    def test_cursor_of_another_search_is_rejected(self, admin_headers):
+        create_products(admin_headers, [(f"lamp {index}", "d") for index in range(3)])
+        cursor = search(admin_headers, "lamp", size=1)["next_cursor"]
+        response = client.get(
+            "/product/search",
+            params={"q": "desk", "cursor": cursor},
+            headers=admin_headers,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
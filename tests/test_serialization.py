@@ -0,0 +1,49 @@
+from fastapi import status
+from .conftest import client
+from app.main import app
+
+
+class TestSerialization:
+
+    def test_fast_path_matches_the_response_model(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        product = client.post(
+            "/product/",
+            json={
+                "name": "p",
+                "description": "d",
+                "price": 10,
+                "category_id": category["id"],
+            },
+            headers=admin_headers,
+        ).json()
+        # writes still go through response_model validation
+        expected = client.put(
+            f"/product/{product['id']}", json={"price": 12.5}, headers=admin_headers
+        ).json()
+
+        response = client.get(f"/product/{product['id']}", headers=admin_headers)
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected
+        for url in ["/product/", "/product/pagination", "/product/all"]:
+            assert client.get(url, headers=admin_headers).json() == [expected], url
+        for url in ["/product/cursor", "/product/search?q=p"]:
+            response = client.get(url, headers=admin_headers)
+            assert response.json() == {"items": [expected], "next_cursor": None}, url
+
+        response = client.get(f"/category/nested/{category['id']}", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {**category, "subcategories": []}
+
+    def test_openapi_keeps_the_response_models(self):
+        paths = app.openapi()["paths"]
+        schema = paths["/product/pagination"]["get"]["responses"]["200"]["content"][
+            "application/json"
+        ]["schema"]
+        assert schema["items"]["$ref"] == "#/components/schemas/ReadProduct"
+        schema = paths["/product/cursor"]["get"]["responses"]["200"]["content"][
+            "application/json"
+        ]["schema"]
+        assert schema["$ref"] == "#/components/schemas/ProductPage"
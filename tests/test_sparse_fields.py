@@ -0,0 +1,46 @@
+from fastapi import status
+from .conftest import client, assert_max_queries
+
+
+class TestSparseFields:
+
+    def test_only_requested_columns_are_selected(self, admin_headers):
+        category = client.post(
+            "/category/", json={"name": "c"}, headers=admin_headers
+        ).json()
+        client.post(
+            "/product/",
+            json={
+                "name": "p",
+                "description": "a long description",
+                "price": 10,
+                "category_id": category["id"],
+            },
+            headers=admin_headers,
+        )
+
+        for url in ["/product/", "/product/pagination", "/product/all"]:
+            with assert_max_queries(3) as statements:
+                response = client.get(
+                    f"{url}?fields=price,id, name", headers=admin_headers
+                )
+            assert response.status_code == status.HTTP_200_OK, url
+            assert list(response.json()[0]) == ["id", "name", "price"]
+            select = [sql for sql in statements if "FROM product" in sql]
+            assert "description" not in select[0], url
+
+        for url in ["/category/", "/category/pagination", "/category/all"]:
+            response = client.get(f"{url}?fields=name", headers=admin_headers)
+            assert response.json() == [{"name": "c"}], url
+
+        # the cached full list is unaffected by sparse requests
+        response = client.get("/product/", headers=admin_headers)
+        assert "description" in response.json()[0]
+
+    def test_unknown_fields_are_rejected(self, admin_headers):
+        response = client.get("/product/?fields=id,secret", headers=admin_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "secret" in response.json()["detail"]
+
+        response = client.get("/category/pagination?fields=,", headers=admin_headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
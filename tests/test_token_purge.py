@@ -0,0 +1,57 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .conftest import engine
+from app.core.auth import purge_expired_tokens
+from app.models.blacklistedtoken_model import BlacklistedToken
+
+
+async def seed(expired: int, live: int):
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(engine) as session:
+        for index in range(expired + live):
+            offset = timedelta(hours=-1 if index < expired else 1)
+            session.add(
+                BlacklistedToken(
+                    access_token=str(uuid4()),
+                    refresh_token=str(uuid4()),
+                    expires_at=now + offset,
+                )
+            )
+        await session.commit()
+
+
+async def remaining() -> tuple[int, int]:
+    now = datetime.now(timezone.utc)
+    async with AsyncSession(engine) as session:
+        rows = (await session.exec(select(BlacklistedToken.expires_at))).all()
+    expired = sum(1 for expires_at in rows if expires_at < now)
+    return expired, len(rows) - expired
+
+
+class TestTokenPurge:
+
+    def test_purges_expired_tokens_in_chunks(self):
+        asyncio.run(seed(expired=25, live=5))
+        assert asyncio.run(purge_expired_tokens(batch_size=10)) == 25
+        assert asyncio.run(remaining()) == (0, 5)
+
+    def test_locked_rows_are_left_for_later(self):
+        asyncio.run(seed(expired=5, live=2))
+
+        async def purge_while_one_is_locked():
+            async with AsyncSession(engine) as session:
+                await session.exec(
+                    select(BlacklistedToken.id)
+                    .where(BlacklistedToken.expires_at < datetime.now(timezone.utc))
+                    .limit(1)
+                    .with_for_update()
+                )
+                return await purge_expired_tokens(batch_size=2)
+
+        assert asyncio.run(purge_while_one_is_locked()) == 4
+        assert asyncio.run(remaining()) == (1, 2)
+        assert asyncio.run(purge_expired_tokens(batch_size=2)) == 1
+        assert asyncio.run(remaining()) == (0, 2)